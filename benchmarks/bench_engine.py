@@ -0,0 +1,173 @@
+# ⋆⋆⋆ NEON GARDEN ENGINE BENCHMARK ⋆⋆⋆
+# Headless frames/sec + per-frame allocation numbers for the evolve step.
+#
+#   python benchmarks/bench_engine.py
+#   python benchmarks/bench_engine.py --layers 12 17 50 --grid 20 30 200 --rates 0 50 500
+#   python benchmarks/bench_engine.py --float32 > bench_output.txt
+#   python benchmarks/bench_engine.py --layers 12 --grid 200 400 --workers 1 4 8
+#   python benchmarks/bench_engine.py --verify --workers 4   # tiled == serial, bit for bit
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+from garden_engine import GardenEngine
+from garden_tiled import TiledEngine
+
+FRAME_INTERVAL = 0.08  # seconds per frame in the live show (FuncAnimation interval=80)
+VERIFY_FRAMES = 40
+VERIFY_WORKERS = 4
+
+
+def make_command(rng, num_layers):
+    """One random remote command, weighted like a busy show"""
+    roll = rng.random()
+    if roll < 0.7:
+        return {'type': 'midi', 'layer': rng.randrange(num_layers)}
+    if roll < 0.8:
+        return {'type': 'collapse', 'layer': rng.randrange(num_layers)}
+    return {'type': 'adjust', 'param': 'bloom', 'value': round(rng.uniform(0.1, 1.0), 2)}
+
+
+def feed_commands(engine, rng, per_frame, carry):
+    """Queue this frame's share of commands; returns the fractional carry"""
+    carry += per_frame
+    count = int(carry)
+    for _ in range(count):
+        engine.commands.push(make_command(rng, engine.num_layers))
+    return carry - count
+
+
+def run_case(layers, grid, rate, frames, dtype, seed, workers=1):
+    if workers > 1:
+        engine = TiledEngine(layers, grid, dtype=dtype, seed=seed, workers=workers)
+    else:
+        engine = GardenEngine(layers, grid, dtype=dtype, seed=seed)
+    rng = random.Random(seed)
+    per_frame = rate * FRAME_INTERVAL
+    carry = 0.0
+
+    # Warm up (first-touch page faults, lazy numpy init)
+    for _ in range(5):
+        carry = feed_commands(engine, rng, per_frame, carry)
+        engine.step()
+        engine.blend()
+
+    # Timing pass (untraced - tracemalloc slows allocation heavily)
+    start = time.perf_counter()
+    for _ in range(frames):
+        carry = feed_commands(engine, rng, per_frame, carry)
+        engine.step()
+        engine.blend()
+    elapsed = time.perf_counter() - start
+
+    # Allocation pass: peak transient bytes above the resting footprint
+    tracemalloc.start()
+    peaks = []
+    for _ in range(min(frames, 50)):
+        carry = feed_commands(engine, rng, per_frame, carry)
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        engine.step()
+        engine.blend()
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    if workers > 1:
+        engine.close()
+
+    return {
+        'layers': layers,
+        'grid': grid,
+        'workers': workers,
+        'rate': rate,
+        'fps': frames / elapsed if elapsed else float('inf'),
+        'ms': elapsed / frames * 1000,
+        'alloc_kib': float(np.mean(peaks)) / 1024,
+        'alloc_max_kib': max(peaks) / 1024,
+    }
+
+
+def verify_case(layers, grid, rate, frames, dtype, seed, workers):
+    """Step a GardenEngine and a TiledEngine through the same commands; True if they match exactly
+
+    Commands are applied straight, as lockstep does: the pipeline's time
+    budget would defer some by a frame whenever the machine is busy.
+    """
+    serial = GardenEngine(layers, grid, dtype=dtype, seed=seed)
+    tiled = TiledEngine(layers, grid, dtype=dtype, seed=seed, workers=workers)
+    try:
+        per_frame = rate * FRAME_INTERVAL
+        for engine in (serial, tiled):
+            rng = random.Random(seed)
+            carry = 0.0
+            for _ in range(frames):
+                carry += per_frame
+                for _ in range(int(carry)):
+                    engine.apply_command(make_command(rng, layers))
+                carry -= int(carry)
+                engine.evolve()
+        return (np.array_equal(serial.layers, tiled.layers)
+                and np.array_equal(serial.memory_ghosts, tiled.memory_ghosts)
+                and np.array_equal(serial.blend(), tiled.blend()))
+    finally:
+        tiled.close()
+
+
+def verify(args):
+    """--verify: tiled results must equal serial ones bit for bit, in both float types"""
+    frames = args.frames or VERIFY_FRAMES
+    workers = [w for w in args.workers if w > 1] or [VERIFY_WORKERS]
+    rate = max(args.rates)
+    print(f"numpy {np.__version__}, {frames} frames/case at {rate:g} commands/s")
+    failed = 0
+    for dtype in (np.float64, np.float32):
+        for layers in args.layers:
+            for grid in args.grid:
+                for w in workers:
+                    ok = verify_case(layers, grid, rate, frames, dtype, args.seed, w)
+                    failed += not ok
+                    print(f"{np.dtype(dtype).name:>8} {layers:>6} {grid:>5} {w:>5}  "
+                          f"{'ok' if ok else 'MISMATCH'}", flush=True)
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the headless garden engine")
+    parser.add_argument('--layers', type=int, nargs='+', default=[12, 17, 32])
+    parser.add_argument('--grid', type=int, nargs='+', default=[20, 30, 100])
+    parser.add_argument('--rates', type=float, nargs='+', default=[0, 50, 500],
+                        help="remote commands per second")
+    parser.add_argument('--frames', type=int, help=f"default 200, {VERIFY_FRAMES} with --verify")
+    parser.add_argument('--float32', action='store_true')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1],
+                        help="evolve processes (TiledEngine when > 1)")
+    parser.add_argument('--verify', action='store_true',
+                        help="check TiledEngine against GardenEngine instead of timing")
+    args = parser.parse_args(argv)
+    if args.verify:
+        return verify(args)
+    args.frames = args.frames or 200
+
+    dtype = np.float32 if args.float32 else np.float64
+    print(f"numpy {np.__version__}, dtype={np.dtype(dtype).name}, {args.frames} frames/case")
+    print(f"{'LAYERS':>6} {'GRID':>5} {'procs':>5} {'cmd/s':>7} {'fps':>9} {'ms/frame':>9} "
+          f"{'KiB/frame':>10} {'max KiB':>9}")
+    for layers in args.layers:
+        for grid in args.grid:
+            for workers in args.workers:
+                for rate in args.rates:
+                    r = run_case(layers, grid, rate, args.frames, dtype, args.seed, workers)
+                    print(f"{r['layers']:>6} {r['grid']:>5} {r['workers']:>5} {r['rate']:>7g} "
+                          f"{r['fps']:>9.1f} {r['ms']:>9.3f} {r['alloc_kib']:>10.1f} "
+                          f"{r['alloc_max_kib']:>9.1f}", flush=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
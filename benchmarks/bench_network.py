@@ -0,0 +1,335 @@
+# ⋆⋆⋆ NEON GARDEN NETWORK LOAD BENCHMARK ⋆⋆⋆
+# Starts a host on loopback, connects N simulated clients that play midi,
+# collapse and adjust traffic (Poisson arrivals), and measures end-to-end
+# command latency from one client's send, through the host's read loop and
+# apply step, to receipt on every OTHER client - plus throughput, loss and
+# the host's CPU and memory as N grows.
+#
+#   python benchmarks/bench_network.py
+#   python benchmarks/bench_network.py --clients 1 10 50 100 --duration 20
+#   python benchmarks/bench_network.py --host relay --midi-rate 20 --adjust-rate 20
+#   python benchmarks/bench_network.py --host garden        # full display host (raster, off screen)
+#   python benchmarks/bench_network.py --connect 192.168.1.20:5000 --host-pid 4242 --clients 20
+#
+# Hosts: 'lockstep' = garden_relay.py --simulate (clients get the commands in
+# the host's TICKs, so latency includes waiting for the next step), 'relay' =
+# garden_relay.py fanning commands straight out, 'garden' = the launcher's
+# host with its raster window going to a scratch file.
+#
+# midi and adjust commands carry an id in their float value (id * 1e-6, which
+# survives the f32 record and the 6-decimal rounding), so each receipt can be
+# matched with its send time. The host folds several midi notes for one
+# layer in a frame into one strength and adjusts into the last value per
+# param, by design: those show up as 'folded', not lost.
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from garden_metrics import RollingStats
+from garden_net import read_frame
+from garden_protocol import (PROTOCOL_VERSION, MSG_HELLO, MSG_COMMANDS, MSG_JSON, MSG_TICK,
+                             encode_hello, decode_hello, encode_commands, decode_commands,
+                             decode_tick)
+
+PORT = 5700            # Away from a live show on 5000
+LAYERS = 12
+ID_SCALE = 1e-6        # Command id -> float value; ids stay below 1 / ID_SCALE
+HOST_START_TIMEOUT = 20.0
+DRAIN_TIME = 1.0       # Seconds to keep reading after the last send
+HOSTS = ('lockstep', 'relay', 'garden')
+KINDS = ('midi', 'collapse', 'adjust')
+
+
+# ─── HOST ──────────────────────────────
+def start_host(kind, port, workdir):
+    """Spawn a host process on loopback; returns the Popen (output goes to host.log)"""
+    if kind == 'garden':
+        cmd = [os.path.join(ROOT, 'collaborative_neon_garden.py'), '--mode', 'host', '--render', 'raster',
+               '--output', os.path.join(workdir, 'frames.rgb'), '--quality', '1',
+               '--no-controls', '--no-midi']
+    else:
+        cmd = [os.path.join(ROOT, 'garden_relay.py')] + (['--simulate'] if kind == 'lockstep' else [])
+    log = open(os.path.join(workdir, 'host.log'), 'ab')
+    return subprocess.Popen([sys.executable] + cmd + ['--port', str(port), '--no-announce'],
+                            stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, cwd=ROOT)
+
+
+async def wait_for_host(addr, proc=None, timeout=HOST_START_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while True:
+        if proc and proc.poll() is not None:
+            raise RuntimeError(f"host exited with {proc.returncode}")
+        try:
+            _, writer = await asyncio.open_connection(*addr)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"no host on {addr[0]}:{addr[1]} after {timeout:.0f} s")
+            await asyncio.sleep(0.1)
+
+
+def process_usage(pid):
+    """(CPU seconds, RSS MiB) of a process, (None, None) where the platform can't tell"""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil:
+        try:
+            proc = psutil.Process(pid)
+            times = proc.cpu_times()
+            return times.user + times.system, proc.memory_info().rss / 2 ** 20
+        except psutil.Error:
+            return None, None
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')  # utime + stime
+        with open(f'/proc/{pid}/status') as f:
+            rss = next(int(line.split()[1]) for line in f if line.startswith('VmRSS:')) / 1024
+        return cpu, rss
+    except (OSError, ValueError, StopIteration):
+        return None, None
+
+
+# ─── LOAD GENERATOR ────────────────────
+class Load:
+    """Bookkeeping shared by every simulated client of one case"""
+
+    def __init__(self, rates, seed):
+        self.rates = rates  # kind -> commands/s per client
+        self.seed = seed
+        self.next_id = 0
+        self.sent_at = {}   # id -> (send time, client index)
+        self.latency = RollingStats(window=1 << 20)
+        self.timed = dict.fromkeys(('midi', 'adjust'), 0)  # ids timed on another client
+        self.sending = False
+
+    def new_id(self, client):
+        self.next_id = self.next_id % (int(1 / ID_SCALE) - 1) + 1
+        self.sent_at[self.next_id] = (time.perf_counter(), client)
+        return self.next_id
+
+
+class SimClient:
+    """One raw protocol connection: sends Poisson traffic, reads every frame the host sends"""
+
+    def __init__(self, load, index):
+        self.load = load
+        self.index = index
+        self.rng = random.Random(f'{load.seed}-{index}')
+        self.sent = dict.fromkeys(KINDS, 0)
+        self.received = dict.fromkeys(KINDS, 0)
+        self.seen = set()  # ids already timed on this client (folded midi repeats one id)
+        self.reader = self.writer = None
+
+    async def connect(self, addr):
+        self.reader, self.writer = await asyncio.open_connection(*addr)
+        self.writer.write(encode_hello())
+        msg_type, payload = await read_frame(self.reader)
+        if msg_type != MSG_HELLO or decode_hello(payload) != PROTOCOL_VERSION:
+            raise RuntimeError("host speaks another protocol version")
+
+    def command(self, kind):
+        if kind == 'collapse':
+            return {'type': 'collapse', 'layer': self.rng.randrange(LAYERS)}
+        value = self.load.new_id(self.index) * ID_SCALE
+        if kind == 'midi':
+            return {'type': 'midi', 'layer': self.rng.randrange(LAYERS), 'strength': value}
+        return {'type': 'adjust', 'param': self.rng.choice(('bloom', 'glitch')), 'value': value}
+
+    async def send_loop(self):
+        rates = self.load.rates
+        total = sum(rates.values())
+        if not total:
+            return
+        kinds, weights = list(rates), list(rates.values())
+        next_send = time.perf_counter()
+        while self.load.sending:
+            next_send += self.rng.expovariate(total)
+            await asyncio.sleep(max(next_send - time.perf_counter(), 0))
+            if not self.load.sending:
+                break
+            kind = self.rng.choices(kinds, weights)[0]
+            self.writer.write(encode_commands([self.command(kind)]))
+            self.sent[kind] += 1
+            await self.writer.drain()
+
+    async def read_loop(self):
+        try:
+            while True:
+                msg_type, payload = await read_frame(self.reader)
+                if msg_type == MSG_TICK:
+                    _, cmds = decode_tick(payload)
+                elif msg_type in (MSG_COMMANDS, MSG_JSON):
+                    cmds = decode_commands(msg_type, payload)
+                else:
+                    continue  # SNAPSHOT for late joiners
+                self.on_commands(cmds, time.perf_counter())
+        except (asyncio.IncompleteReadError, OSError):
+            pass
+
+    def on_commands(self, cmds, now):
+        for cmd in cmds:
+            kind = cmd['type']
+            self.received[kind] += 1
+            if kind == 'collapse':
+                continue
+            cmd_id = round(cmd.get('strength' if kind == 'midi' else 'value', 0) / ID_SCALE)
+            sent = self.load.sent_at.get(cmd_id)
+            if sent is None or cmd_id in self.seen:
+                continue
+            self.seen.add(cmd_id)
+            if sent[1] != self.index:  # Only other clients count: that's what the audience sees
+                self.load.latency.add((now - sent[0]) * 1000)
+                self.load.timed[kind] += 1
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+
+
+async def run_load(addr, clients, rates, duration, seed):
+    load = Load(rates, seed)
+    sims = [SimClient(load, k) for k in range(clients)]
+    await asyncio.gather(*(sim.connect(addr) for sim in sims))
+    readers = [asyncio.get_running_loop().create_task(sim.read_loop()) for sim in sims]
+    await asyncio.sleep(0.5)  # Join frames (lockstep keyframe) out of the way
+
+    load.sending = True
+    started = time.perf_counter()
+    senders = [asyncio.get_running_loop().create_task(sim.send_loop()) for sim in sims]
+    await asyncio.sleep(duration)
+    load.sending = False
+    await asyncio.gather(*senders)
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(DRAIN_TIME)
+    for sim in sims:
+        sim.close()
+    for task in readers:
+        task.cancel()
+    return load, sims, elapsed
+
+
+def summarize(load, sims, elapsed, echo):
+    """Turn per-client counts into rates, loss and fold shares
+
+    echo: the host sends clients their own commands too (lockstep TICKs).
+    """
+    totals = {kind: sum(sim.sent[kind] for sim in sims) for kind in KINDS}
+    result = {'sent_per_s': sum(totals.values()) / elapsed,
+              'recv_per_s': sum(sum(sim.received.values()) for sim in sims) / elapsed}
+    for kind in KINDS:
+        expected = sum(totals[kind] - (0 if echo else sim.sent[kind]) for sim in sims)
+        received = sum(sim.received[kind] for sim in sims)
+        result[f'{kind}_lost'] = 100 * (1 - received / expected) if expected else 0.0
+    # Notes that arrived under a later note's id: the host merged their strengths
+    could = sum(totals['midi'] - sim.sent['midi'] for sim in sims)
+    result['folded'] = 100 * (1 - load.timed['midi'] / could) if could else 0.0
+    result['latency'] = load.latency.summary()
+    return result
+
+
+# ─── CASES ─────────────────────────────
+def run_case(args, clients, workdir):
+    proc = None
+    if args.connect:
+        host, _, port = args.connect.rpartition(':')
+        addr, pid = (host, int(port)), args.host_pid
+    else:
+        proc = start_host(args.host, args.port, workdir)
+        addr, pid = ('127.0.0.1', args.port), proc.pid
+    rates = {'midi': args.midi_rate, 'collapse': args.collapse_rate, 'adjust': args.adjust_rate}
+    try:
+        async def case():
+            await wait_for_host(addr, proc)
+            await asyncio.sleep(args.settle)  # Host imports / first frames out of the way
+            before = process_usage(pid) if pid else (None, None)
+            own_before, started = time.process_time(), time.perf_counter()
+            outcome = await run_load(addr, clients, rates, args.duration, args.seed)
+            after = process_usage(pid) if pid else (None, None)
+            wall = time.perf_counter() - started
+            return outcome, before, after, (time.process_time() - own_before) / wall, wall
+
+        (load, sims, elapsed), before, after, own_cpu, wall = asyncio.run(case())
+    finally:
+        if proc:
+            proc.terminate()
+            try:
+                proc.wait(5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+
+    result = summarize(load, sims, elapsed, echo=args.host != 'relay')
+    result['clients'] = clients
+    result['host_cpu'] = None if before[0] is None or after[0] is None else 100 * (after[0] - before[0]) / wall
+    result['host_rss'] = after[1]
+    result['gen_cpu'] = 100 * own_cpu
+    return result
+
+
+def _fmt(value, spec):
+    return format(value, spec) if value is not None else '-'.rjust(int(spec.split('.')[0]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the neon garden network path")
+    parser.add_argument('--host', choices=HOSTS, default='lockstep', help="host to start per case")
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 5, 10, 25, 50])
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds of traffic per case")
+    parser.add_argument('--midi-rate', type=float, default=4.0, help="notes/s per client")
+    parser.add_argument('--collapse-rate', type=float, default=0.2, help="collapses/s per client")
+    parser.add_argument('--adjust-rate', type=float, default=5.0, help="slider updates/s per client")
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--settle', type=float, default=1.0, help="seconds between host up and load")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--connect', metavar='HOST:PORT', help="use a running host instead")
+    parser.add_argument('--host-pid', type=int, help="with --connect: pid to read CPU / memory from")
+    args = parser.parse_args(argv)
+    if args.connect and args.host == 'relay':
+        print("Note: --host relay only changes loss accounting (no echo) with --connect", file=sys.stderr)
+
+    per_client = args.midi_rate + args.collapse_rate + args.adjust_rate
+    print(f"host {args.connect or args.host}, {per_client:g} cmd/s per client "
+          f"(midi {args.midi_rate:g}, collapse {args.collapse_rate:g}, adjust {args.adjust_rate:g}), "
+          f"{args.duration:g} s per case")
+    print(f"{'CLIENTS':>7} {'in/s':>7} {'out/s':>8} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} "
+          f"{'max ms':>7} {'midi%':>6} {'coll%':>6} {'adj%':>6} {'fold%':>6} {'host%':>6} "
+          f"{'RSS MiB':>8} {'gen%':>5}")
+    with tempfile.TemporaryDirectory(prefix='bench_network_') as workdir:
+        for clients in args.clients:
+            try:
+                r = run_case(args, clients, workdir)
+            except (RuntimeError, OSError) as e:
+                print(f"{clients:>7} failed: {e}", flush=True)
+                log = os.path.join(workdir, 'host.log')
+                if os.path.exists(log):
+                    with open(log, errors='replace') as f:
+                        sys.stderr.write(''.join(f.readlines()[-10:]))
+                continue
+            lat = r['latency']
+            print(f"{r['clients']:>7} {r['sent_per_s']:>7.0f} {r['recv_per_s']:>8.0f} "
+                  f"{_fmt(lat.get('p50'), '7.1f')} {_fmt(lat.get('p95'), '7.1f')} "
+                  f"{_fmt(lat.get('p99'), '7.1f')} {_fmt(lat.get('max'), '7.1f')} "
+                  f"{r['midi_lost']:>6.1f} {r['collapse_lost']:>6.1f} {r['adjust_lost']:>6.1f} "
+                  f"{r['folded']:>6.1f} {_fmt(r['host_cpu'], '6.1f')} {_fmt(r['host_rss'], '8.1f')} "
+                  f"{r['gen_cpu']:>5.0f}", flush=True)
+    print("midi% / coll% = commands that never reached the clients; adj% = adjust updates not "
+          "delivered\n(the host keeps the last value per param each step, by design); fold% = notes "
+          "merged into a\nlater note's strength on the host (the note still plays); gen% = this "
+          "generator's own CPU")
+
+
+if __name__ == '__main__':
+    main()
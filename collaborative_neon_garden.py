@@ -1,559 +1,427 @@
 # ⋆⋆⋆ LAN AUTO-DISCOVERY COLLABORATIVE NEON GARDEN ⋆⋆⋆
 # (Optimized for Pydroid 3 / Android - no audio, smooth performance)
-
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-import numpy as np
-import random
-import threading
-import socket
-import json
-import tkinter as tk
-from tkinter import simpledialog, messagebox
-import mido
+#
+#   python collaborative_neon_garden.py                      # asks host/client
+#   python collaborative_neon_garden.py --mode host --timing
+#   python collaborative_neon_garden.py --mode client --host-ip 192.168.1.20
+#   python collaborative_neon_garden.py --mode host --record show.ngs.gz
+#   python collaborative_neon_garden.py --mode host --share garden   # + garden_framebuffer.py viewers
+#   python collaborative_neon_garden.py --mode host --render raster --output - | ffmpeg ...
+#   python garden_relay.py --simulate                       # headless host, no window
+#
+# Rendering (matplotlib), the Tk panel and MIDI are imported only once the
+# chosen mode needs them, so the network is up before the window is built.
+
+import argparse
 import sys
 import time
 
+from garden_metrics import StartupTimer, FrameMetrics, start_metrics_log, start_metrics_server
+startup = StartupTimer()  # Started before numpy & co. so their import cost is reported
+
+import numpy as np
+from garden_engine import GardenEngine, SIM_RATE  # Garden steps/sec on its own clock (host sets it)
+from garden_net import GardenServer, GardenClient, PORT
+from garden_commands import CONTROL_RATE  # Max slider updates/sec put on the network
+from garden_discovery import get_local_ip, Announcer, discover
+from garden_sync import LockstepHost, LockstepClient
+
 # ─── CONFIG (Mobile-friendly defaults) ─────────────────
 LAYERS = 12        # Reduced from 17 for better performance
 GRID_SIZE = 20     # Reduced from 30
-SIGILS = ["⊱","⟡","⚚","⩀","⦿"]
-EMOJIS = ["🌸","✨","🫧","🌼","💫","🍃","🌙","⚡","🪞"]
-
-layers = [np.random.rand(GRID_SIZE, GRID_SIZE)*0.3 for _ in range(LAYERS)]
-memory_ghosts = [np.zeros((GRID_SIZE, GRID_SIZE)) for _ in range(LAYERS)]
-observer_attention = [0.0 for _ in range(LAYERS)]
-
-midi_triggered_layers = []
-remote_commands = []
-client_connections = []
-
-# ─── PERFORMANCE VARIABLES ─────────────
-bloom_intensity = 0.5
-glitch_speed = 0.05
-neon_glow = True
+USE_FLOAT32 = False  # Halves memory traffic on weak devices
+WORKERS = 1        # >1: evolve on this many cores (worth it from GRID_SIZE ~200)
+RENDER_MODE = 'atlas'  # 'atlas' = one image for all layers, 'axes' = one axes per layer,
+                       # 'raster' = numpy only, no matplotlib (see garden_raster)
+RASTER_OUTPUT = 'tk'   # raster: 'tk' window, '-' = raw RGB on stdout, or a file to memory-map
+GLYPH_MODE = 'pool'    # 'pool' = re-used Text artists, 'sprites' = cached rasters (atlas only), 'off'
+QUALITY = 'auto'   # 'auto' = adapt to hold TARGET_FPS, or a fixed level 0 (rich) .. 6 (see garden_quality)
+TARGET_FPS = 12.5  # Frames/sec the animation timer asks for
+INTERPOLATE = True # Draw in-between states (smooth at any fps, one step behind) or just the newest
+LOCKSTEP = True    # Host: keep every screen's garden identical (clients follow automatically)
+SEED = None        # Host: fixed seed for a repeatable garden (None = random)
+MIDI_PORTS = None       # None = default input, 'all' = every input, or a list of port names
+VELOCITY_BLOOM = False  # Louder notes bloom harder
+
+# ─── GARDEN STATE (set up by main) ─────
+engine = None   # GardenEngine
+renderer = None # AtlasRenderer / AxesRenderer once the window exists
+server = None   # GardenServer when hosting
+client = None   # GardenClient when joined to a host
+sync = None     # LockstepHost / LockstepClient when frames are shared
+midi = None     # MidiInput once started
+metrics = FrameMetrics()  # Disabled (no-op) unless --hud / --metrics-log / --metrics-port
+hud = None      # garden_render.Hud with --hud
+governor = None # QualityGovernor with --quality auto
+recorder = None # garden_session.SessionRecorder with --record
+framebuffer = None  # garden_framebuffer.FramePublisher with --share
+clock = None    # garden_clock.SimClock stepping the engine
+view = None     # garden_clock.StateView the renderer draws from
 
 # ─── NETWORK CONFIG ────────────────────
 HOST = '0.0.0.0'
-PORT = 5000
-DISCOVERY_PORT = 5001
-DISCOVERY_INTERVAL = 1.0
-
-def get_local_ip():
-    """Pure stdlib way - no netifaces needed"""
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-        s.close()
-        return ip
-    except:
-        return '127.0.0.1'
+REDISCOVER_TIMEOUT = 2.0  # Client: per reconnect attempt, look this long for a moved host
+HOST_QUERY_TIMEOUT = 2.0  # Client with --host-ip: how long that host gets to describe its garden
 
 # ─── NETWORK FUNCTIONS ─────────────────
-def handle_client(conn, addr):
-    global remote_commands, client_connections
-    client_connections.append(conn)
-    try:
-        while True:
-            data = conn.recv(1024)
-            if not data: break
-            try:
-                cmd = json.loads(data.decode())
-                remote_commands.append(cmd)
-            except: pass
-    finally:
-        if conn in client_connections:
-            client_connections.remove(conn)
-        conn.close()
-
-def broadcast_command(cmd):
-    dead = []
-    for conn in client_connections:
-        try:
-            conn.send(json.dumps(cmd).encode())
-        except:
-            dead.append(conn)
-    for d in dead:
-        client_connections.remove(d)
-
-def start_server():
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    s.bind((HOST, PORT))
-    s.listen()
-    print(f"Server listening on {get_local_ip()}:{PORT}")
-    threading.Thread(target=udp_broadcast_thread, daemon=True).start()
-    while True:
-        conn, addr = s.accept()
-        threading.Thread(target=handle_client, args=(conn, addr), daemon=True).start()
-
-def udp_broadcast_thread():
-    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-    s.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-    message = get_local_ip().encode()
-    while True:
-        s.sendto(message, ('<broadcast>', DISCOVERY_PORT))
-        time.sleep(DISCOVERY_INTERVAL)
-
-def listen_for_host():
-    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    s.bind(('', DISCOVERY_PORT))
-    s.settimeout(10)
-    try:
-        data, addr = s.recvfrom(1024)
-        host_ip = data.decode()
-        print(f"Discovered host at {host_ip}")
-        return host_ip
-    except:
-        print("No host discovered on LAN.")
-        return None
-
-def connect_to_server(server_ip):
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.connect((server_ip, PORT))
-    return s
-
-# ─── FIGURE SETUP (Optimized) ──────────
-fig, axes = plt.subplots(1, LAYERS, figsize=(16, 3))  # Smaller figure
-plt.subplots_adjust(wspace=0, hspace=0)
-for ax in axes: ax.axis('off')
-cmap = plt.cm.magma_r
-
-# Pre-create imshow artists for speed
-images = []
-for i, ax in enumerate(axes):
-    depth_factor = 1.0 - i * 0.05
-    blended = (layers[i] * 0.8 + memory_ghosts[i] * 0.2) * depth_factor
-    im = ax.imshow(blended, cmap=cmap, vmin=0, vmax=1, animated=True)
-    images.append(im)
-
-# ─── LAYER FUNCTIONS ───────────────────
-def collapse_layer(layer_index):
-    layers[layer_index] = np.random.rand(GRID_SIZE, GRID_SIZE)
-    memory_ghosts[layer_index] = np.zeros((GRID_SIZE, GRID_SIZE))
-
-def overlay_symbols(ax, layer_data, layer_index, frame):
-    num_symbols = random.randint(5, 12)  # Fewer on mobile
-    for _ in range(num_symbols):
-        x, y = random.randint(0, GRID_SIZE-1), random.randint(0, GRID_SIZE-1)
-        symbol = random.choice(SIGILS + EMOJIS)
-        alpha = 0.5 + random.random() * 0.5
-        if neon_glow:
-            alpha += np.sin(random.random() * frame * 0.1) * 0.2
-        color = (0.2, 1.0, 1.0) if symbol in SIGILS else (1.0, 0.8, 0.2)
-        ax.text(y, x, symbol, color=color, fontsize=12, ha='center', va='center',
-                alpha=min(alpha, 1.0))
+def on_remote_commands(cmds, peer=None):
+    if isinstance(sync, LockstepHost):
+        sync.submit(cmds)
+    else:
+        engine.commands.extend(cmds)
+
+def submit_local(cmds, send_func=None, apply_local=True):
+    """GUI / MIDI input: lockstep hands it to the frame clock, otherwise queue it and share
+
+    Any thread: the commands wait in the engine's pipeline for the next
+    simulation step, so they never touch the arrays mid-evolve.
+    """
+    if sync and sync.ready:
+        sync.submit(cmds)
+        return
+    if apply_local:
+        engine.commands.extend(cmds)
+    if send_func: send_func(cmds)
+
+def broadcast_commands(cmds):
+    if server: server.broadcast(cmds)
+
+def start_server(port=PORT, lockstep=LOCKSTEP, announce=True):
+    global server, sync
+    if lockstep:
+        sync = LockstepHost(engine)
+    server = GardenServer(HOST, port, on_commands=on_remote_commands,
+                          on_join=sync.join_frames if sync else None).start()
+    if sync:
+        sync.publish = server.broadcast_frame
+    announcer = Announcer(port, engine.num_layers, engine.grid_size, lockstep=sync is not None,
+                          rate=engine.rate, dtype=engine.dtype.name)
+    if announce:
+        announcer.start()
+    print(f"Server listening on {get_local_ip()}:{port} (session {announcer.session})")
+
+def rediscover():
+    found = discover(REDISCOVER_TIMEOUT)
+    return (found['ip'], found['port']) if found else None
+
+def connect_to_server(server_ip, port=PORT, resolve=None):
+    global client, sync
+    # Free-runs until the host sends a lockstep keyframe, then follows its ticks;
+    # if the link drops it free-runs again and keeps reconnecting in the background
+    sync = LockstepClient(engine)
+
+    def on_host_lost():
+        sync.detach()
+        if sync.refused:  # Retrying can't help: the host's garden isn't ours
+            client.reconnect = False
+            print(f"Not rejoining the host: {sync.refused}. Restart to adopt its garden, "
+                  f"or pass its --layers/--grid/--sim-rate/--float32.")
+
+    client = GardenClient(server_ip, port, on_commands=on_remote_commands,
+                          on_frame=sync.on_frame, reconnect=True, resolve=resolve,
+                          on_close=on_host_lost)
+    client.connect()  # The first keyframe may be refused before this returns
+    sync.send = client.send
+    return client
 
 # ─── MIDI INPUT ─────────────────────────
-def midi_listener(send_global=False):
-    global midi_triggered_layers
-    try:
-        inport = mido.open_input()
-        for msg in inport.iter_pending():
-            if msg.type == 'note_on' and msg.velocity > 0:
-                layer_index = msg.note % LAYERS
-                midi_triggered_layers.append(layer_index)
-                if send_global:
-                    broadcast_command({'type': 'midi', 'layer': layer_index})
-    except Exception as e:
-        pass  # Silent on mobile if no MIDI
-
-def start_midi_thread(send_global=False):
-    threading.Thread(target=midi_loop, args=(send_global,), daemon=True).start()
-
-def midi_loop(send_global):
-    while True:
-        midi_listener(send_global)
-        time.sleep(0.02)
-
-# ─── PERFORMANCE GUI ────────────────────
-def create_gui(send_func=None):
-    global bloom_intensity, glitch_speed, neon_glow
-
-    root = tk.Tk()
-    root.title("Neon Garden Controls")
-
-    tk.Label(root, text="Bloom Intensity").pack()
-    bloom_slider = tk.Scale(root, from_=0.1, to=1.0, resolution=0.05, orient='horizontal',
-                            command=lambda v: set_param('bloom', float(v), send_func))
-    bloom_slider.set(bloom_intensity)
-    bloom_slider.pack()
-
-    tk.Label(root, text="Glitch Speed").pack()
-    glitch_slider = tk.Scale(root, from_=0.01, to=0.2, resolution=0.01, orient='horizontal',
-                             command=lambda v: set_param('glitch', float(v), send_func))
-    glitch_slider.set(glitch_speed)
-    glitch_slider.pack()
-
-    neon_check = tk.Checkbutton(root, text="Neon Glow",
-                                command=lambda: set_param('neon_glow', not neon_glow, send_func))
-    neon_check.select()
-    neon_check.pack()
-
-    collapse_frame = tk.Frame(root)
-    collapse_frame.pack()
-    for i in range(LAYERS):
-        tk.Button(collapse_frame, text=f"{i+1}",
-                  command=lambda l=i: collapse_and_send(l, send_func),
-                  width=3, height=2).grid(row=i//4, column=i%4)
-
-    tk.Button(root, text="Collapse All", command=lambda: collapse_all_and_send(send_func),
-              bg='red', fg='white', width=15).pack(pady=5)
-
-    def set_param(param, val, sf):
-        globals()[param] = val
-        if sf: sf({'type': 'adjust', 'param': param, 'value': val})
-
-    def collapse_and_send(layer, sf):
-        collapse_layer(layer)
-        if sf: sf({'type': 'collapse', 'layer': layer})
-
-    def collapse_all_and_send(sf):
-        for i in range(LAYERS):
-            collapse_layer(i)
-            if sf: sf({'type': 'collapse', 'layer': i})
-
-    threading.Thread(target=root.mainloop, daemon=True).start()
-
-# ─── MAIN ANIMATION LOOP (Optimized) ───
-def update_layers(frame):
-    global remote_commands, midi_triggered_layers
-
-    # Process remote commands
-    for cmd in remote_commands[:]:
-        if cmd['type'] == 'midi':
-            midi_triggered_layers.append(cmd['layer'] % LAYERS)
-        elif cmd['type'] == 'collapse':
-            collapse_layer(cmd['layer'] % LAYERS)
-        elif cmd['type'] == 'adjust':
-            globals()[cmd['param']] = cmd['value']
-    remote_commands.clear()
-
-    # Evolve layers
-    for i in range(LAYERS):
-        glitch = np.random.rand(GRID_SIZE, GRID_SIZE) * 0.1 * glitch_speed
-        layers[i] = np.clip(layers[i] + glitch + observer_attention[i] * 0.3, 0, 1)
-        observer_attention[i] *= 0.95
-
-        memory_ghosts[i] = np.clip(memory_ghosts[i] * 0.95 + layers[i] * 0.05, 0, 1)
-        if i > 0: layers[i-1] += memory_ghosts[i] * 0.03
-        if i < LAYERS-1: layers[i+1] += memory_ghosts[i] * 0.03
-
-        if i in midi_triggered_layers:
-            layers[i] += np.random.rand(GRID_SIZE, GRID_SIZE) * bloom_intensity
-            midi_triggered_layers.remove(i) if i in midi_triggered_layers else None
-
-        # Update pre-created image
-        depth_factor = 1.0 - i * 0.05
-        blended = (layers[i] * 0.8 + memory_ghosts[i] * 0.2) * depth_factor
-        images[i].set_data(blended)
-
-        # Overlay symbols (clears previous by re-drawing on same ax)
-        axes[i].texts.clear()
-        overlay_symbols(axes[i], layers[i], i, frame)
-
-    return images
-
-# ─── MODE SELECTION & LAUNCH ───────────
-root = tk.Tk()
-root.withdraw()
-
-mode = simpledialog.askstring("Mode", "Select mode [host/client]:", parent=root)
-if mode:
-    mode = mode.strip().lower()
-if mode not in ["host", "client"]:
-    messagebox.showerror("Error", "Invalid mode. Use 'host' or 'client'.")
-    sys.exit()
-
-print(f"Running as {mode.upper()}")
-
-if mode == "host":
-    ip = get_local_ip()
-    print(f"Your IP: {ip}")
-    threading.Thread(target=start_server, daemon=True).start()
-    create_gui(send_func=broadcast_command)
-    start_midi_thread(send_global=True)
-else:  # client
-    host_ip = listen_for_host()
-    if not host_ip:
-        host_ip = simpledialog.askstring("Host IP", "Enter host IP manually:", parent=root)
-        if not host_ip:
-            messagebox.showerror("Error", "No IP provided.")
-            sys.exit()
-    client_sock = connect_to_server(host_ip.strip())
-    create_gui(send_func=lambda cmd: client_sock.send(json.dumps(cmd).encode()))
-    start_midi_thread(send_global=False)
-
-root.destroy()
-
-# Fullscreen attempt
-manager = plt.get_current_fig_manager()
-try:
-    manager.full_screen_toggle()
-except:
-    pass
-
-# Faster animation for mobile
-ani = animation.FuncAnimation(fig, update_layers, interval=80, blit=True, cache_frame_data=False)
-plt.show()
-# ─── NETWORK CONFIG ────────────────────
-HOST = '0.0.0.0'
-PORT = 5000
-DISCOVERY_PORT = 5001
-DISCOVERY_INTERVAL = 1.0  # seconds
-
-def get_local_ip():
-    try:
-        for iface in netifaces.interfaces():
-            addrs = netifaces.ifaddresses(iface)
-            if netifaces.AF_INET in addrs:
-                for link in addrs[netifaces.AF_INET]:
-                    ip = link['addr']
-                    if ip != '127.0.0.1':
-                        return ip
-    except: pass
-    return '127.0.0.1'
-
-# ─── NETWORK FUNCTIONS ─────────────────
-def handle_client(conn, addr):
-    global remote_commands, client_connections
-    client_connections.append(conn)
-    try:
-        while True:
-            data = conn.recv(1024)
-            if not data: break
-            try:
-                cmd = json.loads(data.decode())
-                remote_commands.append(cmd)
-            except:
-                pass
-    finally:
-        client_connections.remove(conn)
-        conn.close()
-
-def broadcast_command(cmd):
-    for conn in client_connections:
-        try:
-            conn.send(json.dumps(cmd).encode())
-        except:
-            pass
-
-def start_server():
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.bind((HOST, PORT))
-    s.listen()
-    print(f"Server listening on {get_local_ip()}:{PORT}")
-    threading.Thread(target=udp_broadcast_thread, daemon=True).start()
-    while True:
-        conn, addr = s.accept()
-        threading.Thread(target=handle_client, args=(conn, addr), daemon=True).start()
-
-# ─── UDP BROADCAST FOR AUTO-DISCOVERY ──
-def udp_broadcast_thread():
-    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-    s.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-    message = get_local_ip().encode()
-    while True:
-        s.sendto(message, ('<broadcast>', DISCOVERY_PORT))
-        time.sleep(DISCOVERY_INTERVAL)
-
-def listen_for_host():
-    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    s.bind(('', DISCOVERY_PORT))
-    s.settimeout(10)
-    try:
-        data, addr = s.recvfrom(1024)
-        host_ip = data.decode()
-        print(f"Discovered host at {host_ip}")
-        return host_ip
-    except:
-        print("No host discovered on LAN.")
-        return None
-
-def connect_to_server(server_ip):
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.connect((server_ip, PORT))
-    return s
-
-# ─── AUDIO STREAM ───────────────────────
-def audio_callback(indata, frames, time, status):
-    global audio_level
-    if audio_reactive:
-        audio_level = np.linalg.norm(indata)
-
-stream = sd.InputStream(callback=audio_callback)
-stream.start()
-
-# ─── FIGURE FULLSCREEN ─────────────────
-fig, axes = plt.subplots(1, LAYERS, figsize=(24,4))
-plt.subplots_adjust(wspace=0,hspace=0)
-for ax in axes: ax.axis('off')
-cmap = plt.cm.magma_r
-
-# ─── LAYER FUNCTIONS ───────────────────
-def collapse_layer(layer_index):
-    layers[layer_index] = np.random.rand(GRID_SIZE, GRID_SIZE)
-    memory_ghosts[layer_index] = np.zeros((GRID_SIZE, GRID_SIZE))
-
-def overlay_symbols(ax, layer_data, layer_index, frame):
-    num_symbols = random.randint(5,18)
-    for _ in range(num_symbols):
-        x, y = random.randint(0, GRID_SIZE-1), random.randint(0, GRID_SIZE-1)
-        symbol = random.choice(SIGILS + EMOJIS)
-        alpha = 0.5 + random.random()*0.5
-        if neon_glow:
-            alpha += np.sin(random.random()*frame*0.1)*0.2
-        color = (0.2,1.0,1.0) if symbol in SIGILS else (1.0,0.8,0.2)
-        ax.text(y, x, symbol, color=color, fontsize=14, ha='center', va='center', alpha=min(alpha,1.0))
+midi_send_func = None
+
+def start_midi_thread(send_global=False, ports=MIDI_PORTS, velocity_bloom=VELOCITY_BLOOM):
+    """Open the MIDI port(s) once; notes are picked up by poll_midi() each frame"""
+    global midi, midi_send_func
+    from garden_midi import MidiInput
+    midi_send_func = broadcast_commands if send_global else None
+    midi = MidiInput(engine.num_layers, ports=ports, velocity_bloom=velocity_bloom)
+    if not midi.start():
+        midi = None  # Silent on mobile if no MIDI
+
+def poll_midi():
+    if midi:
+        cmds, oldest = midi.drain()
+        if cmds:
+            submit_local(cmds, midi_send_func)
+            # Note -> the step that takes it (free-running applies it straight after)
+            metrics.gauge('midi_ms', round((time.perf_counter() - oldest) * 1000, 2))
+
+# ─── SIMULATION & ANIMATION LOOPS ──────
+def record_queues():
+    metrics.gauge('commands', engine.commands.depth)
+    if midi:
+        metrics.gauge('midi', len(midi.events))
+    if isinstance(sync, LockstepHost):
+        metrics.gauge('lockstep', sync.pending.depth)
+    elif sync:
+        metrics.gauge('lag', sync.lag)
+
+def simulate():
+    """One fixed-length step, on the clock thread: input, commands, evolve, publish"""
+    metrics.begin(frame=False)
+    if recorder:
+        recorder.tick(lockstep=bool(sync and sync.ready))
+    poll_midi()
+    metrics.mark('input')
+
+    # Process remote commands, then evolve the whole stack
+    if isinstance(sync, LockstepClient):
+        sync.load_keyframe()  # A (re)join keyframe lands here, between two steps
+    if sync and sync.ready:
+        sync.step()   # Lockstep: host stamps + publishes, clients follow (and catch up)
+        metrics.mark('lockstep')
+    else:
+        engine.process_commands()
+        metrics.mark('commands')
+        engine.evolve()
+        metrics.mark('evolve')
+    if framebuffer:
+        framebuffer.publish(engine)
+        metrics.mark('share')
+    view.publish()
+    metrics.mark('publish')
 
-# ─── MIDI INPUT ─────────────────────────
-def midi_listener(send_global=False):
-    global midi_triggered_layers
-    try:
-        inport = mido.open_input()
-        for msg in inport.iter_pending():
-            if msg.type == 'note_on' and msg.velocity > 0:
-                layer_index = msg.note % LAYERS
-                midi_triggered_layers.append(layer_index)
-                if send_global:
-                    broadcast_command({'type':'midi','layer':layer_index})
-    except Exception as e:
-        print("MIDI input unavailable:", e)
-
-def start_midi_thread(send_global=False):
-    threading.Thread(target=midi_loop, args=(send_global,), daemon=True).start()
-
-def midi_loop(send_global):
-    while True:
-        midi_listener(send_global)
-
-# ─── PERFORMANCE GUI ────────────────────
-def create_gui(send_func=None):
-    global bloom_intensity, glitch_speed, audio_reactive, neon_glow
-
-    root = tk.Tk()
-    root.title("Collaborative Garden Installer")
-
-    tk.Label(root, text="Bloom Intensity").pack()
-    bloom_slider = tk.Scale(root, from_=0.1, to=1.0, resolution=0.05, orient='horizontal',
-                            command=lambda v: set_bloom(v))
-    bloom_slider.set(bloom_intensity)
-    bloom_slider.pack()
-
-    tk.Label(root, text="Glitch Speed").pack()
-    glitch_slider = tk.Scale(root, from_=0.01, to=0.2, resolution=0.01, orient='horizontal',
-                             command=lambda v: set_glitch(v))
-    glitch_slider.set(glitch_speed)
-    glitch_slider.pack()
-
-    audio_check = tk.Checkbutton(root, text="Audio Reactive", command=lambda: toggle_audio())
-    audio_check.select()
-    audio_check.pack()
-
-    neon_check = tk.Checkbutton(root, text="Neon Glow", command=lambda: toggle_neon())
-    neon_check.select()
-    neon_check.pack()
-
-    collapse_frame = tk.Frame(root)
-    collapse_frame.pack()
-    for i in range(LAYERS):
-        tk.Button(collapse_frame, text=f"Collapse {i+1}", command=lambda l=i: collapse_layer_gui(l, send_func)).grid(row=i//4, column=i%4)
-
-    tk.Button(root, text="Collapse All", command=lambda: collapse_all_gui(send_func), bg='red', fg='white').pack()
-
-    def set_bloom(v):
-        global bloom_intensity
-        bloom_intensity = float(v)
-        if send_func: send_func({'type':'adjust','param':'bloom','value':bloom_intensity})
-
-    def set_glitch(v):
-        global glitch_speed
-        glitch_speed = float(v)
-        if send_func: send_func({'type':'adjust','param':'glitch','value':glitch_speed})
-
-    def toggle_audio():
-        global audio_reactive
-        audio_reactive = not audio_reactive
-        if send_func: send_func({'type':'adjust','param':'audio_reactive','value':audio_reactive})
-
-    def toggle_neon():
-        global neon_glow
-        neon_glow = not neon_glow
-        if send_func: send_func({'type':'adjust','param':'neon_glow','value':neon_glow})
-
-    def collapse_layer_gui(layer, send_func):
-        collapse_layer(layer)
-        if send_func: send_func({'type':'collapse','layer':layer})
-
-    def collapse_all_gui(send_func):
-        for i in range(LAYERS):
-            collapse_layer(i)
-            if send_func: send_func({'type':'collapse','layer':i})
-
-    threading.Thread(target=root.mainloop, daemon=True).start()
-
-# ─── MAIN LOOP ─────────────────────────
 def update_layers(frame):
-    global remote_commands, midi_triggered_layers
-    for cmd in remote_commands:
-        if cmd['type'] == 'midi':
-            layer = cmd['layer'] % LAYERS
-            midi_triggered_layers.append(layer)
-        elif cmd['type'] == 'collapse':
-            collapse_layer(cmd['layer'] % LAYERS)
-        elif cmd['type'] == 'adjust':
-            param = cmd['param']
-            val = cmd['value']
-            globals()[param] = val
-    remote_commands = []
-
-    for i in range(LAYERS):
-        glitch = np.random.rand(GRID_SIZE,GRID_SIZE)*0.1*(1+audio_level*3)*glitch_speed
-        layers[i] = np.clip(layers[i]+glitch+observer_attention[i]*0.3, 0,1)
-        observer_attention[i] *= 0.95
-        memory_ghosts[i] = np.clip(memory_ghosts[i]*0.95 + layers[i]*0.05,0,1)
-        if i>0: layers[i-1] += memory_ghosts[i]*0.03
-        if i<LAYERS-1: layers[i+1] += memory_ghosts[i]*0.03
-
-        if i in midi_triggered_layers:
-            layers[i] += np.random.rand(GRID_SIZE,GRID_SIZE)*bloom_intensity
-            midi_triggered_layers.remove(i)
-
-        depth_factor = 1.0 - i*0.03
-        axes[i].imshow((layers[i]*0.8 + memory_ghosts[i]*0.2)*depth_factor, cmap=cmap, vmin=0,vmax=1)
-        overlay_symbols(axes[i], layers[i], i, frame)
-    return axes
-
-# ─── LAUNCH INSTALLER ───────────────────
-if __name__ == "__main__":
-    print("Welcome to the Collaborative Neon Garden Installer!")
-    mode = input("Select mode [host/client]: ").strip().lower()
-
-    if mode == "host":
-        local_ip = get_local_ip()
-        print(f"Detected local IP: {local_ip}")
-        threading.Thread(target=start_server, daemon=True).start()
-        create_gui(send_func=broadcast_command)
-        start_midi_thread(send_global=True)
-
-    elif mode == "client":
-        print("Searching for host on LAN...")
-        host_ip = listen_for_host()
-        if host_ip is None:
-            host_ip = input("Enter host IP manually: ").strip()
-        s = connect_to_server(host_ip)
-        create_gui(send_func=lambda cmd: s.send(json.dumps(cmd).encode()))
-        start_midi_thread(send_global=False)
+    if governor:
+        governor.frame_start()
+    metrics.begin()
+    if metrics.enabled:
+        record_queues()
+        metrics.gauge('sim_skipped', clock.skipped)
+
+    # Returns every animated artist (image(s) + glyphs) for blitting
+    artists = renderer.draw(frame)
+    if hud:
+        artists = artists + [hud.update()]
+        metrics.mark('hud')
+    if governor:
+        governor.frame_end()
+        metrics.gauge('quality', governor.level)
+    return artists
+
+# ─── COMMAND LINE ──────────────────────
+def parse_args(argv=None):
+    from garden_quality import LEVELS  # Stdlib only, cheap
+    parser = argparse.ArgumentParser(description="Collaborative neon garden for the LAN")
+    parser.add_argument('--mode', choices=('host', 'client'),
+                        help="skip the mode dialog")
+    parser.add_argument('--host-ip', help="client: connect here instead of waiting for discovery")
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--layers', type=int, default=LAYERS)
+    parser.add_argument('--grid', type=int, default=GRID_SIZE)
+    parser.add_argument('--float32', action='store_true', default=USE_FLOAT32)
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help="processes for the evolve step (0 = one per core)")
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--render', choices=('atlas', 'axes', 'raster'), default=RENDER_MODE)
+    parser.add_argument('--output', default=RASTER_OUTPUT,
+                        help="raster: 'tk', '-' (raw rgb24 on stdout) or a file to memory-map")
+    parser.add_argument('--glyphs', choices=('pool', 'sprites', 'off'), default=GLYPH_MODE)
+    parser.add_argument('--quality', default=QUALITY, choices=['auto', *map(str, range(len(LEVELS)))],
+                        help=f"'auto' to hold --target-fps, or a fixed level 0 (rich) to {len(LEVELS) - 1} (light)")
+    parser.add_argument('--target-fps', type=float, default=TARGET_FPS,
+                        help="frames drawn per second (the garden's pace is --sim-rate)")
+    parser.add_argument('--sim-rate', type=float, default=SIM_RATE,
+                        help="garden steps per second; clients take the host's")
+    parser.add_argument('--no-interpolate', dest='interpolate', action='store_false',
+                        default=INTERPOLATE, help="draw the newest step instead of in-between states")
+    parser.add_argument('--no-lockstep', dest='lockstep', action='store_false', default=LOCKSTEP,
+                        help="host: share commands only, every screen evolves on its own")
+    parser.add_argument('--no-announce', dest='announce', action='store_false',
+                        help="host: stay off LAN discovery (clients need --host-ip)")
+    parser.add_argument('--no-controls', dest='controls', action='store_false',
+                        help="don't open the Tk control panel")
+    parser.add_argument('--no-midi', dest='midi', action='store_false')
+    parser.add_argument('--timing', action='store_true',
+                        help="print how long each startup phase took")
+    parser.add_argument('--record', metavar='FILE',
+                        help="log the session for garden_session.py replay (.gz = compressed)")
+    parser.add_argument('--share', metavar='NAME',
+                        help="publish every frame to local garden_framebuffer.py viewers")
+    parser.add_argument('--hud', action='store_true', help="frame-time overlay on the garden")
+    parser.add_argument('--metrics-log', metavar='FILE',
+                        help="append a JSON metrics snapshot every few seconds")
+    parser.add_argument('--metrics-port', type=int,
+                        help="serve /metrics (Prometheus) and /json on this port")
+    args = parser.parse_args(argv)
+    if args.render == 'axes' and args.glyphs == 'sprites':
+        parser.error("--glyphs sprites needs --render atlas or raster")
+    return args
+
+def fail(message, dialogs):
+    if dialogs:
+        from garden_gui import show_error
+        show_error(message)
+    sys.exit(message)
 
+# ─── MODE SELECTION & LAUNCH ───────────
+def main(argv=None):
+    global engine, renderer, metrics, hud, governor, recorder, framebuffer, clock, view
+    args = parse_args(argv)
+    startup.mark('imports')
+    if args.render == 'raster' and args.output == '-':
+        args.frame_stream = sys.stdout.buffer
+        sys.stdout = sys.stderr  # Frames own stdout; status lines go to the terminal
+    if args.hud or args.metrics_log or args.metrics_port:
+        metrics = FrameMetrics(enabled=True)
+
+    # Dialogs only when the command line left something open
+    mode = args.mode
+    dialogs = mode is None
+    if dialogs:
+        from garden_gui import ask_mode
+        mode = ask_mode()
+        if not mode:
+            fail("Invalid mode. Use 'host' or 'client'.", dialogs)
+    print(f"Running as {mode.upper()}")
+
+    # Clients look for the host first: its announcement says how big the garden is
+    found = None
+    if mode == "client":
+        found = discover(HOST_QUERY_TIMEOUT, host=args.host_ip.strip()) if args.host_ip else discover()
+        if found and found.get('layers') and (found['layers'], found['grid']) != (args.layers, args.grid):
+            print(f"Using the host's garden: {found['layers']} layers x {found['grid']}")
+            args.layers, args.grid = found['layers'], found['grid']
+        if found and found.get('rate'):
+            args.sim_rate = found['rate']  # Lockstep needs the same step length everywhere
+        if found and found.get('dtype'):
+            args.float32 = found['dtype'] == 'float32'  # ... and the same arithmetic
+        startup.mark('discovery')
+
+    dtype = np.float32 if args.float32 else np.float64
+    if args.workers != 1:
+        from garden_tiled import TiledEngine
+        engine = TiledEngine(args.layers, args.grid, dtype=dtype, seed=args.seed,
+                             workers=args.workers or None, rate=args.sim_rate)
     else:
-        print("Invalid mode, exiting.")
-        sys.exit()
+        engine = GardenEngine(args.layers, args.grid, dtype=dtype, seed=args.seed, rate=args.sim_rate)
+    if args.record:
+        from garden_session import SessionRecorder
+        recorder = SessionRecorder(args.record, engine)
+    if args.share:
+        from garden_framebuffer import FramePublisher
+        framebuffer = FramePublisher(args.share, args.layers, args.grid, dtype)
+    startup.mark('engine')
 
+    if mode == "host":
+        print(f"Your IP: {get_local_ip()}")
+        start_server(args.port, lockstep=args.lockstep, announce=args.announce)
+        send_func = broadcast_commands
+    else:  # client
+        if found and not args.host_ip:
+            connect_to_server(found['ip'], found['port'], resolve=rediscover)
+        elif found:
+            connect_to_server(args.host_ip.strip(), found['port'])
+        else:
+            host_ip = args.host_ip
+            if not host_ip:
+                from garden_gui import ask_host_ip
+                host_ip = ask_host_ip()
+                if not host_ip:
+                    fail("No IP provided.", True)
+            connect_to_server(host_ip.strip(), args.port)
+        send_func = client.send
+    metrics.peer_source = ((lambda: server.peers) if server else
+                           (lambda: [client.peer] if client.peer else []))
+    if args.metrics_log:
+        start_metrics_log(metrics, args.metrics_log)
+    if args.metrics_port:
+        start_metrics_server(metrics, args.metrics_port)
+    startup.mark('network')
+
+    if args.controls:
+        from garden_gui import create_gui
+        create_gui(engine, lambda cmds, apply_local=True: submit_local(cmds, send_func, apply_local),
+                   lockstep=lambda: bool(sync and sync.ready), max_rate=CONTROL_RATE)
+        startup.mark('controls')
+    if args.midi:
+        start_midi_thread(send_global=(mode == "host"))
+        startup.mark('midi')
+
+    # The garden keeps its own time from here on; the window only samples it
+    from garden_clock import SimClock, StateView
+    view = StateView(engine, interpolate=args.interpolate)
+    clock = SimClock(simulate, engine.rate).start()
+
+    from garden_quality import QualityGovernor, LEVELS, DEFAULT_LEVEL
+    auto = args.quality == 'auto'
+    level = DEFAULT_LEVEL if auto else int(args.quality)
+    max_symbols = LEVELS[0 if auto else level]['max_symbols']
+    if args.render == 'raster':
+        run_raster(args, level, auto, max_symbols)
+        return
+
+    import matplotlib.pyplot as plt
+    from garden_render import make_renderer, animate, Hud
+    renderer = make_renderer(args.render, view, figsize=(16, 3), glyphs=args.glyphs, metrics=metrics,
+                             max_symbols=max_symbols)  # Smaller figure
+    # Thinning ghost updates would desync lockstep screens (and recordings), so only without them
+    quality = QualityGovernor(renderer, engine, args.target_fps, level,
+                              allow_sim=sync is None and recorder is None)
+    if auto:
+        governor = quality
+    if args.hud:
+        hud = Hud(renderer.fig.axes[0], metrics)
+
+    # Fullscreen attempt
     manager = plt.get_current_fig_manager()
-    try: manager.full_screen_toggle()
-    except: pass
-
-    ani = animation.FuncAnimation(fig, update_layers, frames=2000, interval=50, blit=False)
+    try:
+        manager.full_screen_toggle()
+    except:
+        pass
+    startup.mark('window')
+
+    started = False
+
+    def first_frame(frame):
+        nonlocal started
+        artists = update_layers(frame)
+        if not started:
+            started = True
+            startup.mark('first frame')
+            if args.timing:
+                print(startup.report())
+        return artists
+
+    # Faster animation for mobile
+    ani = animate(renderer.fig, first_frame, interval=1000 / args.target_fps, metrics=metrics)
     plt.show()
-    stream.stop()
+    clock.stop()
+    if recorder:
+        recorder.close()
+
+
+def run_raster(args, level, auto, max_symbols):
+    """The matplotlib-free path: numpy framebuffer into a Tk window, a pipe or a mapped file"""
+    global renderer, governor
+    from garden_raster import RasterRenderer, make_sink, frame_shape, run
+    from garden_quality import QualityGovernor
+    sink = make_sink(args.output, frame_shape(engine.num_layers, engine.grid_size),
+                     getattr(args, 'frame_stream', None))
+    renderer = RasterRenderer(view, sink, glyphs='off' if args.glyphs == 'off' else 'sprites',
+                              max_symbols=max_symbols, metrics=metrics)
+    quality = QualityGovernor(renderer, engine, args.target_fps, level,
+                              allow_sim=sync is None and recorder is None)
+    if auto:
+        governor = quality
+    if args.hud:
+        print("--hud needs a matplotlib renderer; use --metrics-port with --render raster")
+    startup.mark('window')
+
+    started = False
+
+    def first_frame(frame):
+        nonlocal started
+        update_layers(frame)
+        if not started:
+            started = True
+            startup.mark('first frame')
+            if args.timing:
+                print(startup.report())
+
+    run(sink, first_frame, args.target_fps)
+    clock.stop()
+    if recorder:
+        recorder.close()
+
+
+if __name__ == '__main__':
+    main()
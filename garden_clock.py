@@ -0,0 +1,120 @@
+# ⋆⋆⋆ NEON GARDEN SIMULATION CLOCK ⋆⋆⋆
+# The garden steps on its own fixed-timestep clock on a thread of its own,
+# so a slow screen no longer slows the garden down and every device keeps
+# the same tempo. Renderers draw from a StateView instead of the engine:
+# the two newest published states, blended by how far the clock has got
+# towards the next step, at whatever rate the display manages.
+#
+#   view = StateView(engine)
+#   clock = SimClock(lambda: (engine.step(), view.publish()), engine.rate).start()
+#   renderer = AtlasRenderer(view)   # draws at any fps
+#   ...
+#   clock.stop()
+
+import threading
+import time
+
+import numpy as np
+
+from garden_engine import SIM_RATE
+
+MAX_STEPS = 4  # Steps run back to back to catch up after a stall; any more time is let go
+
+
+class SimClock:
+    """Calls step() rate times a second on a background thread
+
+    Late steps are caught up (up to max_steps at once) so the garden keeps
+    its tempo through short hiccups; after a longer stall (suspend,
+    overload) the clock resumes from now instead of bursting.
+    """
+
+    def __init__(self, step, rate=SIM_RATE, max_steps=MAX_STEPS, name="garden-sim"):
+        self.step = step
+        self.interval = 1.0 / rate
+        self.max_steps = max_steps
+        self.name = name
+        self.stopped = threading.Event()
+        self.thread = None
+        self.steps = 0
+        self.skipped = 0  # Steps let go after stalls
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop and wait for the step in progress, so the caller may close what it uses"""
+        self.stopped.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def _run(self):
+        next_step = time.monotonic()
+        while not self.stopped.is_set():
+            now = time.monotonic()
+            done = 0
+            while next_step <= now and done < self.max_steps:
+                try:
+                    self.step()
+                except Exception as e:
+                    print(f"Simulation step failed: {e}", flush=True)
+                next_step += self.interval
+                done += 1
+            self.steps += done
+            if next_step <= now:
+                behind = int((now - next_step) / self.interval) + 1
+                self.skipped += behind
+                next_step += behind * self.interval
+            self.stopped.wait(max(next_step - time.monotonic(), 0))
+
+
+class StateView:
+    """What a renderer sees of an engine that is stepped on another thread
+
+    publish() (simulation thread, after each step) copies the blended
+    stack; blend() (render thread) returns the previous and newest copies
+    interpolated by the time since publish, so motion is smooth at any
+    display rate one step behind the simulation. interpolate=False shows
+    the newest state as is. Has the engine attributes the renderers use.
+    """
+
+    def __init__(self, engine, interpolate=True):
+        self.engine = engine
+        self.num_layers = engine.num_layers
+        self.grid_size = engine.grid_size
+        self.dtype = engine.dtype
+        self.interval = 1.0 / engine.rate
+        self.interpolate = interpolate
+        self.lock = threading.Lock()
+        blended = engine.blend()
+        self.previous = blended.copy()
+        self.newest = blended.copy()
+        self.blended = np.empty_like(blended)
+        self.frame = engine.frame
+        self.neon_glow = engine.neon_glow
+        self.published = time.perf_counter()
+
+    def publish(self):
+        blended = self.engine.blend()
+        with self.lock:
+            self.previous, self.newest = self.newest, self.previous
+            self.newest[...] = blended
+            self.frame = self.engine.frame
+            self.neon_glow = self.engine.neon_glow
+            self.published = time.perf_counter()
+
+    def blend(self, count=None):
+        """Like GardenEngine.blend: the first count layers are refreshed, the rest kept"""
+        n = self.num_layers if count is None else count
+        out = self.blended[:n]
+        with self.lock:
+            if not self.interpolate:
+                out[...] = self.newest[:n]
+                return self.blended
+            t = min((time.perf_counter() - self.published) / self.interval, 1.0)
+            np.subtract(self.newest[:n], self.previous[:n], out=out)
+            out *= t
+            out += self.previous[:n]
+        return self.blended
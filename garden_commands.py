@@ -0,0 +1,154 @@
+# ⋆⋆⋆ NEON GARDEN COMMAND PIPELINE ⋆⋆⋆
+# Network, MIDI and Tk threads push; the frame loop drains. Everything that
+# can be folded is folded on the way in, so a flood costs memory for one
+# value per param and one counter per layer, not one entry per message:
+#   adjust   -> last value per param
+#   midi     -> per-layer trigger counter, capped (+ latest strength)
+#   the rest -> bounded ring (oldest dropped when full)
+
+import collections
+import threading
+import time
+
+RING_CAPACITY = 1024        # Queued collapse/other commands before the oldest are dropped
+MAX_COMMANDS_PER_FRAME = 64  # Ring commands applied per frame; the rest wait
+FRAME_TIME_BUDGET = 0.005    # Seconds of command work allowed per frame
+CHEAP_COMMANDS = ('adjust', 'midi')
+MAX_PENDING_BLOOMS = 8       # Per layer (~0.6 s of blooms); a flood beyond that is shed
+CONTROL_RATE = 20            # Max slider updates per second sent to the network
+
+
+class CommandPipeline:
+    """Thread-safe, bounded, coalescing command ingest for one garden"""
+
+    def __init__(self, num_layers, capacity=RING_CAPACITY):
+        self.num_layers = num_layers
+        self.lock = threading.Lock()
+        self.ring = collections.deque(maxlen=capacity)
+        self.params = {}
+        self.triggers = [0] * num_layers
+        self.strength = [1.0] * num_layers
+        self.dropped = 0
+
+    # ─── PRODUCERS (any thread) ─────────
+    def push(self, cmd):
+        kind = cmd.get('type')
+        with self.lock:
+            if kind == 'adjust':
+                self.params.pop(cmd['param'], None)  # Re-insert so order = last change
+                self.params[cmd['param']] = cmd['value']
+            elif kind == 'midi':
+                i = cmd['layer'] % self.num_layers
+                count = cmd.get('count', 1)
+                taken = min(count, MAX_PENDING_BLOOMS - self.triggers[i])
+                self.triggers[i] += taken
+                self.dropped += count - taken
+                self.strength[i] = cmd.get('strength', 1.0)
+            else:
+                if len(self.ring) == self.ring.maxlen:
+                    self.dropped += 1
+                self.ring.append(cmd)
+
+    def extend(self, cmds):
+        for cmd in cmds:
+            self.push(cmd)
+
+    @property
+    def depth(self):
+        """Distinct pending items (params + triggered layers + ring entries)"""
+        with self.lock:
+            return len(self.params) + sum(1 for n in self.triggers if n) + len(self.ring)
+
+    # ─── CONSUMER (frame loop) ──────────
+    def drain(self, budget=MAX_COMMANDS_PER_FRAME):
+        """Take this frame's commands: params, then up to budget ring commands, then triggers
+
+        Each triggered layer yields ONE midi command, with 'count' when it
+        was hit more than once.
+        """
+        with self.lock:
+            cmds = [{'type': 'adjust', 'param': p, 'value': v} for p, v in self.params.items()]
+            self.params.clear()
+            for _ in range(min(budget, len(self.ring))):
+                cmds.append(self.ring.popleft())
+            for i, count in enumerate(self.triggers):
+                if count:
+                    cmd = {'type': 'midi', 'layer': i}
+                    if count > 1:
+                        cmd['count'] = count
+                    if self.strength[i] != 1.0:
+                        cmd['strength'] = self.strength[i]
+                    cmds.append(cmd)
+                    self.triggers[i] = 0
+                    self.strength[i] = 1.0
+        return cmds
+
+    def requeue(self, cmds):
+        """Put unprocessed ring commands back at the front, in order"""
+        with self.lock:
+            room = self.ring.maxlen - len(self.ring)
+            keep = cmds[len(cmds) - room:] if room < len(cmds) else cmds
+            self.dropped += len(cmds) - len(keep)
+            self.ring.extendleft(reversed(keep))
+
+    def process(self, engine, budget=MAX_COMMANDS_PER_FRAME, time_budget=FRAME_TIME_BUDGET):
+        """Apply this frame's commands to engine within the count and time budget
+
+        adjust/midi are O(1) and always applied; ring commands (collapse...)
+        left over when the time budget runs out wait for the next frame.
+        """
+        deadline = time.perf_counter() + time_budget
+        late = []
+        cmds = self.drain(budget)
+        for cmd in cmds:
+            if cmd.get('type') in CHEAP_COMMANDS or time.perf_counter() <= deadline:
+                engine.apply_command(cmd)
+            else:
+                late.append(cmd)
+        if late:
+            self.requeue(late)
+        return len(cmds) - len(late)
+
+
+class ControlPublisher:
+    """Rate-limited, last-value-wins sender for continuous controls (sliders)
+
+    The first change after a quiet spell goes out at once; changes inside the
+    next 1/max_rate seconds collapse to the newest value per param, which is
+    always delivered on the trailing edge. send(cmds) runs on a worker thread.
+    """
+
+    def __init__(self, send, max_rate=CONTROL_RATE):
+        self.send = send
+        self.interval = 1.0 / max_rate if max_rate else 0.0
+        self.cond = threading.Condition()
+        self.latest = {}
+        self.last_sent = 0.0
+        self.published = 0
+        self.sent = 0
+        threading.Thread(target=self._run, name="garden-controls", daemon=True).start()
+
+    def publish(self, cmd):
+        with self.cond:
+            self.latest.pop(cmd['param'], None)
+            self.latest[cmd['param']] = cmd
+            self.published += 1
+            self.cond.notify()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.latest:
+                    self.cond.wait()
+                wait = self.last_sent + self.interval - time.monotonic()
+                if wait > 0:
+                    self.cond.wait(wait)
+                    continue
+                batch = list(self.latest.values())
+                self.latest.clear()
+                self.last_sent = time.monotonic()
+                self.sent += len(batch)
+            try:
+                self.send(batch)
+            except Exception as e:
+                print(f"Control publish failed: {e}")
@@ -0,0 +1,241 @@
+# ⋆⋆⋆ NEON GARDEN LAN DISCOVERY ⋆⋆⋆
+# Hosts answer QUERY datagrams at once and also announce themselves on the
+# broadcast address every DISCOVERY_INTERVAL. Both carry a small JSON
+# description: TCP port, session id, garden size, step rate, float type and
+# protocol version.
+# Clients ask first - the last host they used directly, then the whole
+# LAN - so finding a running host takes milliseconds, not a broadcast
+# period. Stdlib only, so headless hosts can use it.
+#
+#   query        = {"app": "neon-garden", "query": 1}          -> QUERY_PORT
+#   announcement = {"app": "neon-garden", "port": 5000, "session": "3f9a0c1e",
+#                   "layers": 12, "grid": 20, "rate": 12.5, "dtype": "float64", "protocol": 4,
+#                   "lockstep": true, "name": ...}
+
+import json
+import os
+import secrets
+import select
+import socket
+import struct
+import threading
+import time
+
+from garden_protocol import PROTOCOL_VERSION
+
+DISCOVERY_PORT = 5001   # Announcements (clients listen here)
+QUERY_PORT = 5002       # Queries (hosts listen here)
+DISCOVERY_INTERVAL = 1.0
+DISCOVERY_TIMEOUT = 10
+QUERY_SCHEDULE = (0.0, 0.05, 0.15, 0.4)  # Seconds into discovery to (re)send queries; then every second
+APP = 'neon-garden'
+CACHE_PATH = os.path.join(os.path.expanduser('~'), '.neon_garden_host.json')
+ROUTE_PROBE = '8.8.8.8'  # Only used to pick the default-route interface; nothing is sent
+SIOCGIFADDR = 0x8915
+
+
+# ─── LOCAL ADDRESS ─────────────────────
+def _route_ip(target):
+    """Our address on the interface that routes to target (UDP connect sends nothing)"""
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        s.connect((target, 9))
+        return s.getsockname()[0]
+    except OSError:
+        return None
+    finally:
+        s.close()
+
+
+def _interface_ips():
+    """IPv4 addresses of the up interfaces (Linux / Android), loopback excluded"""
+    try:
+        import fcntl
+    except ImportError:
+        return []
+    ips = []
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        for _, name in socket.if_nameindex():
+            try:
+                packed = fcntl.ioctl(s.fileno(), SIOCGIFADDR, struct.pack('256s', name[:15].encode()))
+                ips.append(socket.inet_ntoa(packed[20:24]))
+            except OSError:
+                pass  # No IPv4 address on this one
+    finally:
+        s.close()
+    return [ip for ip in ips if not ip.startswith('127.')]
+
+
+def get_local_ip(peer=None):
+    """Our LAN address (as seen by peer, if given) - works on networks with no internet
+
+    Tries the route to peer, then the default route, then the interface
+    list; never blocks and never sends a packet.
+    """
+    for target in (peer, ROUTE_PROBE):
+        ip = target and _route_ip(target)
+        if ip and not ip.startswith('127.') and ip != '0.0.0.0':
+            return ip
+    ips = _interface_ips()
+    return ips[0] if ips else '127.0.0.1'
+
+
+# ─── HOST SIDE ─────────────────────────
+class Announcer:
+    """Answers discovery queries and broadcasts an announcement every interval
+
+    Garden details that aren't known (a relay without a garden) are None.
+    """
+
+    def __init__(self, port, layers=None, grid=None, lockstep=False, interval=DISCOVERY_INTERVAL,
+                 rate=None, dtype=None):
+        self.session = secrets.token_hex(4)
+        self.info = {'app': APP, 'port': port, 'session': self.session, 'layers': layers,
+                     'grid': grid, 'rate': rate, 'dtype': dtype, 'protocol': PROTOCOL_VERSION,
+                     'lockstep': lockstep, 'name': socket.gethostname()}
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.queries = 0
+
+    def start(self):
+        threading.Thread(target=self._run, name="garden-discovery", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+    def _message(self, peer=None):
+        return json.dumps(dict(self.info, ip=get_local_ip(peer))).encode()
+
+    def _run(self):
+        """Survives the network dropping out and the IP changing"""
+        shout = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        shout.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        ear = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        ear.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            ear.bind(('', QUERY_PORT))
+        except OSError as e:
+            print(f"Discovery queries off ({e}); announcing only")
+            ear.close()
+            ear = None
+        next_shout = 0.0
+        while not self.stopped.is_set():
+            now = time.monotonic()
+            if now >= next_shout:
+                try:
+                    shout.sendto(self._message(), ('<broadcast>', DISCOVERY_PORT))
+                except OSError:
+                    pass  # Wi-Fi down / no route yet: try again next interval
+                next_shout = now + self.interval
+            wait = max(next_shout - time.monotonic(), 0)
+            if ear is None:
+                self.stopped.wait(wait)
+                continue
+            if not select.select([ear], [], [], wait)[0]:
+                continue
+            try:
+                data, addr = ear.recvfrom(1024)
+                if json.loads(data).get('app') == APP:
+                    ear.sendto(self._message(addr[0]), addr)
+                    self.queries += 1
+            except (OSError, ValueError, AttributeError):
+                pass  # Junk datagram or the client vanished
+        shout.close()
+        if ear:
+            ear.close()
+
+
+# ─── CLIENT SIDE ───────────────────────
+def load_cached_host(path=CACHE_PATH):
+    """The last host we joined, or None"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_host(info, path=CACHE_PATH):
+    try:
+        with open(path, 'w') as f:
+            json.dump(dict(info, seen=time.time()), f)
+    except OSError:
+        pass  # Read-only home: we just won't be as quick next time
+
+
+def _parse(data, addr):
+    try:
+        info = json.loads(data)
+    except ValueError:
+        return None
+    if not isinstance(info, dict) or info.get('app') != APP or 'port' not in info:
+        return None
+    info['ip'] = addr[0]  # Where the answer came from beats what the host thinks its IP is
+    return info
+
+
+def discover(timeout=DISCOVERY_TIMEOUT, cache=True, host=None):
+    """Find a host: query the cached one + the LAN, and listen for announcements
+
+    Returns the host's announcement dict (with 'ip') or None. Hosts with
+    another protocol version are reported and skipped. host: only ask this
+    address (a client given --host-ip still needs the host's garden size).
+    """
+    cached = load_cached_host() if cache and not host else None
+    query = json.dumps({'app': APP, 'query': 1}).encode()
+    asker = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    asker.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+    sockets = [asker]
+    if not host:
+        ear = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        ear.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            ear.bind(('', DISCOVERY_PORT))
+            sockets.append(ear)
+        except OSError:
+            ear.close()  # A host on this machine holds the port: queries still work
+    if host:
+        targets = [host]
+    else:
+        targets = ([cached['ip']] if cached and cached.get('ip') else []) + ['<broadcast>']
+
+    start = time.monotonic()
+    schedule = list(QUERY_SCHEDULE)
+    skipped = set()
+    try:
+        while True:
+            elapsed = time.monotonic() - start
+            if elapsed >= timeout:
+                print(f"No answer from {host}." if host else "No host discovered on LAN.")
+                return None
+            if elapsed >= schedule[0]:
+                for target in targets:
+                    try:
+                        asker.sendto(query, (target, QUERY_PORT))
+                    except OSError:
+                        pass
+                schedule = schedule[1:] or [schedule[0] + 1.0]
+            wait = max(min(schedule[0], timeout) - (time.monotonic() - start), 0)
+            for s in select.select(sockets, [], [], wait)[0]:
+                try:
+                    info = _parse(*s.recvfrom(1024))
+                except OSError:
+                    continue
+                if info is None:
+                    continue
+                if info.get('protocol') != PROTOCOL_VERSION:
+                    if info['ip'] not in skipped:
+                        skipped.add(info['ip'])
+                        print(f"Skipping host {info['ip']}: protocol v{info.get('protocol')}, "
+                              f"we speak v{PROTOCOL_VERSION}")
+                    continue
+                print(f"Discovered host at {info['ip']}:{info['port']} (session {info.get('session')}, "
+                      f"{(time.monotonic() - start) * 1000:.0f} ms)")
+                if cache:
+                    save_cached_host(info)
+                return info
+    finally:
+        for s in sockets:
+            s.close()
@@ -0,0 +1,205 @@
+# ⋆⋆⋆ NEON GARDEN ENGINE ⋆⋆⋆
+# Headless simulation core - numpy only, no GUI / network / MIDI imports.
+
+import copy
+
+import numpy as np
+
+from garden_commands import CommandPipeline, MAX_PENDING_BLOOMS
+
+# ─── DEFAULTS ──────────────────────────
+LAYERS = 12
+GRID_SIZE = 20
+SIM_RATE = 12.5  # Steps per second (the old 80 ms animation frame)
+
+# Fades are per second, so the garden moves at the same speed at any step
+# rate; the small per-step pushes (glitch, attention, bleed, ghost intake)
+# scale with the step length. At SIM_RATE both come out exactly as the
+# original per-frame constants.
+ATTENTION_KEEP = 0.95 ** SIM_RATE  # Share of observer attention left after one second
+GHOST_KEEP = 0.95 ** SIM_RATE      # Share of a memory ghost left after one second
+DEPTH_STEP = 0.05   # Blend falloff per layer of depth ...
+DEPTH_FLOOR = 0.2   # ... squeezed so the deepest layer of a tall stack keeps this much
+
+# Remote 'adjust' commands use short names; map them onto engine attributes
+PARAM_ALIASES = {
+    'bloom': 'bloom_intensity',
+    'glitch': 'glitch_speed',
+    'neon_glow': 'neon_glow',
+}
+PARAMS = ('bloom_intensity', 'glitch_speed', 'neon_glow')
+
+
+def layer_range(total, parts, index):
+    """[start, stop) of part index when total layers are split into contiguous parts"""
+    return total * index // parts, total * (index + 1) // parts
+
+
+class GardenEngine:
+    """The whole garden as one (layers, grid, grid) stack, evolved in place"""
+
+    def __init__(self, layers=LAYERS, grid_size=GRID_SIZE, dtype=np.float64, seed=None,
+                 first_layer=0, rate=SIM_RATE, total_layers=None):
+        self.num_layers = layers
+        self.first_layer = first_layer  # Global index of layers[0] when this is a slice of a wall
+        self.total_layers = total_layers or first_layer + layers
+        self.grid_size = grid_size
+        self.dtype = np.dtype(dtype)
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.frame = 0
+        self.rate = rate
+        self.step_scale = SIM_RATE / rate        # Per-step pushes, relative to SIM_RATE steps
+        self.attention_keep = ATTENTION_KEEP ** (1 / rate)
+        self.ghost_keep = GHOST_KEEP ** (1 / rate)
+
+        # Performance variables
+        self.bloom_intensity = 0.5
+        self.glitch_speed = 0.05
+        self.neon_glow = True
+        self.ghost_interval = 1  # Update ghosts every n-th frame (quality governor, non-lockstep)
+
+        shape = (layers, grid_size, grid_size)
+        self.layers = self.rng.random(shape, dtype=self.dtype)
+        self.layers *= 0.3
+        self.memory_ghosts = np.zeros(shape, dtype=self.dtype)
+        self.observer_attention = np.zeros(layers, dtype=self.dtype)
+        self.bloom_strength = np.ones(layers, dtype=self.dtype)  # Per-layer, from MIDI velocity
+
+        # Reusable scratch buffers (no per-frame allocations)
+        self.noise = np.empty(shape, dtype=self.dtype)
+        self.blended = np.empty(shape, dtype=self.dtype)
+        depth = np.arange(first_layer, first_layer + layers, dtype=self.dtype)
+        step = min(DEPTH_STEP, (1.0 - DEPTH_FLOOR) / max(self.total_layers - 1, 1))
+        self.depth_factors = (1.0 - depth * step)[:, None, None]  # Unchanged up to 17 layers
+
+        self.trigger_counts = np.zeros(layers, dtype=np.int64)  # Pending blooms per layer
+        self.commands = CommandPipeline(layers)
+        self.recorder = None  # garden_session.SessionRecorder: sees every applied command
+
+    # ─── CONTROL ───────────────────────
+    def set_param(self, param, value):
+        name = PARAM_ALIASES.get(param, param)
+        if name in PARAMS:
+            setattr(self, name, value)
+
+    def trigger(self, layer_index, strength=1.0, count=1):
+        i = layer_index % self.num_layers
+        self.trigger_counts[i] = min(self.trigger_counts[i] + count, MAX_PENDING_BLOOMS)
+        self.bloom_strength[i] = strength
+
+    def collapse_layer(self, layer_index):
+        self.rng.random(out=self.layers[layer_index], dtype=self.dtype)
+        self.memory_ghosts[layer_index] = 0
+
+    def apply_command(self, cmd):
+        if self.recorder:
+            self.recorder.record(self.frame, cmd)
+        kind = cmd.get('type')
+        if kind == 'midi':
+            self.trigger(cmd['layer'], cmd.get('strength', 1.0), cmd.get('count', 1))
+        elif kind == 'collapse':
+            self.collapse_layer(cmd['layer'] % self.num_layers)
+        elif kind == 'adjust':
+            self.set_param(cmd['param'], cmd['value'])
+
+    def process_commands(self):
+        return self.commands.process(self)
+
+    # ─── EVOLVE ────────────────────────
+    def evolve(self):
+        """One batched evolve step over the whole layer stack (in place)"""
+        self.evolve_local()
+        self.evolve_coupled()
+
+    def evolve_local(self, noise_ready=False):
+        """First half of a frame: everything that needs no neighbouring layers
+
+        noise_ready: self.noise already holds this frame's uniform draws.
+        """
+        layers, ghosts, noise = self.layers, self.memory_ghosts, self.noise
+
+        # Glitch noise + observer attention
+        if not noise_ready:
+            self.rng.random(out=noise, dtype=self.dtype)
+        noise *= 0.1 * self.glitch_speed * self.step_scale
+        layers += noise
+        layers += (self.observer_attention * (0.3 * self.step_scale))[:, None, None]
+        np.clip(layers, 0, 1, out=layers)
+        self.observer_attention *= self.attention_keep
+
+        # Ghost decay
+        if self.frame % self.ghost_interval:
+            return
+        ghosts *= self.ghost_keep
+        np.multiply(layers, 0.05 * self.step_scale, out=noise)
+        ghosts += noise
+        np.clip(ghosts, 0, 1, out=ghosts)
+
+    def evolve_coupled(self, lower_ghost=None, upper_ghost=None):
+        """Second half: ±1 bleed and bloom
+
+        lower_ghost / upper_ghost are this frame's ghost layers just outside
+        the stack (owned by a neighbouring node); they are added in the same
+        order as in one big stack, so a split garden matches bit for bit.
+        """
+        self.bleed(lower_ghost, upper_ghost)
+        self.bloom()
+        self.frame += 1
+
+    def bleed(self, lower_ghost=None, upper_ghost=None):
+        layers, ghosts, noise = self.layers, self.memory_ghosts, self.noise
+
+        # ±1 neighbour bleed (noise[-1] and noise[0] are free once used)
+        rate = 0.03 * self.step_scale
+        np.multiply(ghosts, rate, out=noise)
+        layers[:-1] += noise[1:]
+        if upper_ghost is not None:
+            layers[-1] += np.multiply(upper_ghost, rate, out=noise[-1])
+        layers[1:] += noise[:-1]
+        if lower_ghost is not None:
+            layers[0] += np.multiply(lower_ghost, rate, out=noise[0])
+
+    def bloom(self):
+        layers, noise = self.layers, self.noise
+
+        # MIDI bloom (each layer blooms at most once per frame, extras carry over)
+        triggered = np.flatnonzero(self.trigger_counts)
+        if triggered.size:
+            self.trigger_counts[triggered] -= 1
+            bloom = noise[:triggered.size]
+            self.rng.random(out=bloom, dtype=self.dtype)
+            bloom *= self.bloom_intensity
+            for k, i in enumerate(triggered):
+                if self.bloom_strength[i] != 1:
+                    bloom[k] *= self.bloom_strength[i]
+                    self.bloom_strength[i] = 1
+                layers[i] += bloom[k]
+
+    def slice(self, start, stop):
+        """Engine over layers [start, stop) sharing this one's arrays (tiled workers)"""
+        part = copy.copy(self)
+        part.num_layers = stop - start
+        part.first_layer = self.first_layer + start
+        for name in ('layers', 'memory_ghosts', 'noise', 'blended', 'observer_attention',
+                     'bloom_strength', 'depth_factors', 'trigger_counts'):
+            setattr(part, name, getattr(self, name)[start:stop])
+        return part
+
+    def step(self):
+        """Apply pending commands, then evolve one frame"""
+        self.process_commands()
+        self.evolve()
+
+    def blend(self, count=None):
+        """Compose layers + ghosts with depth falloff into the blended buffer
+
+        count: only the first count layers (the rest keep their last blend).
+        """
+        n = self.num_layers if count is None else count
+        blended, scratch = self.blended[:n], self.noise[:n]
+        np.multiply(self.layers[:n], 0.8, out=blended)
+        np.multiply(self.memory_ghosts[:n], 0.2, out=scratch)
+        blended += scratch
+        blended *= self.depth_factors[:n]
+        return self.blended
@@ -0,0 +1,284 @@
+# ⋆⋆⋆ NEON GARDEN SHARED FRAMEBUFFER ⋆⋆⋆
+# One simulation publishes every frame into a shared-memory ring; any number
+# of viewer processes on the same machine map it (no copies, no sockets) and
+# each shows its own choice of layers and region. N projectors, one garden,
+# one simulation.
+#
+#   python garden_relay.py --simulate --share garden              # headless publisher
+#   python collaborative_neon_garden.py --mode host --share garden
+#   python garden_framebuffer.py --name garden --layers 0-5       # viewer, projector 1
+#   python garden_framebuffer.py --name garden --layers 6-11 --region 0:10,0:20
+#
+# Block layout (native byte order):
+#   header = int64 magic | version | layers | grid | itemsize | slots | latest seq | publisher id
+#            + per slot int64 seq | frame | neon_glow
+#   data   = per slot: layers (L, G, G) then blended (L, G, G), float32/64
+# A slot's seq is 0 while it is being written, so readers can spot torn frames.
+
+import argparse
+import atexit
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+DEFAULT_NAME = 'neon_garden'
+RING_SLOTS = 4       # 4 frames (~320 ms) before a slot is rewritten under a slow reader
+MAGIC = 0x4E47464200000001  # 'NGFB' + 1
+VERSION = 1
+_LATEST, _PUBLISHER = 6, 7
+_HEADER_WORDS = 8
+_SLOT_WORDS = 3
+VIEWER_FPS = 25.0    # Viewers poll faster than the garden so they never skip a frame
+STALE_TIME = 3.0     # Viewer: no new frame this long -> look for a restarted publisher
+
+
+def _layout(slots):
+    words = _HEADER_WORDS + _SLOT_WORDS * slots
+    return words, -(-words * 8 // 64) * 64  # Data starts on a cache line
+
+
+def _attach(name):
+    """Map an existing block without this process's resource tracker unlinking it at exit"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        block = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(block._name, 'shared_memory')
+        except Exception:
+            pass
+        return block
+
+
+class _Ring:
+    """Numpy views over a framebuffer block"""
+
+    def _map(self, block, layers, grid, dtype, slots):
+        words, offset = _layout(slots)
+        self.block = block
+        self.num_layers, self.grid_size, self.dtype, self.slots = layers, grid, np.dtype(dtype), slots
+        self.header = np.ndarray(words, np.int64, buffer=block.buf)
+        self.slot_meta = self.header[_HEADER_WORDS:].reshape(slots, _SLOT_WORDS)
+        self.data = np.ndarray((slots, 2, layers, grid, grid), self.dtype, buffer=block.buf,
+                               offset=offset)
+
+    def _unmap(self):
+        del self.header, self.slot_meta, self.data
+        self.block.close()
+
+
+# ─── PUBLISHER ─────────────────────────
+class FramePublisher(_Ring):
+    """Writes an engine's layers + blended stack into the ring after every frame"""
+
+    def __init__(self, name, layers, grid_size, dtype=np.float64, slots=RING_SLOTS):
+        self.name = name
+        dtype = np.dtype(dtype)
+        size = _layout(slots)[1] + slots * 2 * layers * grid_size * grid_size * dtype.itemsize
+        try:
+            block = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            stale = _attach(name)  # Left behind by a publisher that crashed
+            stale.close()
+            stale.unlink()
+            block = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self._map(block, layers, grid_size, dtype, slots)
+        self.header[:] = 0
+        self.header[:_LATEST] = (MAGIC, VERSION, layers, grid_size, dtype.itemsize, slots)
+        self.header[_PUBLISHER] = time.time_ns()  # Lets viewers tell a restarted publisher apart
+        atexit.register(self.close)
+        print(f"Sharing frames as '{name}' ({size / 1e6:.1f} MB, {slots} slots)")
+
+    def publish(self, engine):
+        seq = int(self.header[_LATEST]) + 1
+        k = seq % self.slots
+        meta = self.slot_meta[k]
+        meta[0] = 0
+        self.data[k, 0] = engine.layers
+        self.data[k, 1] = engine.blend()
+        meta[1] = engine.frame
+        meta[2] = engine.neon_glow
+        meta[0] = seq
+        self.header[_LATEST] = seq
+
+    def close(self):
+        """Remove the block (viewers keep their mapping until they let go)"""
+        if getattr(self, 'block', None) is None:
+            return
+        self._unmap()
+        self.block.unlink()
+        self.block = None
+
+
+# ─── READER ────────────────────────────
+class FrameReader(_Ring):
+    """Read-only view of a publisher's ring (raises FileNotFoundError if none is running)"""
+
+    def __init__(self, name=DEFAULT_NAME):
+        block = _attach(name)
+        head = np.ndarray(_HEADER_WORDS, np.int64, buffer=block.buf)
+        magic, version, layers, grid, itemsize, slots = (int(v) for v in head[:_LATEST])
+        del head
+        if magic != MAGIC or version != VERSION:
+            block.close()
+            raise ValueError(f"'{name}' is not a neon garden framebuffer")
+        self._map(block, layers, grid, {4: np.float32, 8: np.float64}[itemsize], slots)
+        self.name = name
+
+    def latest(self):
+        """(seq, frame, neon_glow, layers, blended) of the newest frame, or None
+
+        layers and blended are views straight into shared memory; check
+        valid(seq) after using them to make sure the slot wasn't rewritten.
+        """
+        seq = int(self.header[_LATEST])
+        if not seq:
+            return None
+        k = seq % self.slots
+        meta = self.slot_meta[k]
+        if meta[0] != seq:
+            return None
+        return seq, int(meta[1]), bool(meta[2]), self.data[k, 0], self.data[k, 1]
+
+    def valid(self, seq):
+        return self.slot_meta[seq % self.slots, 0] == seq
+
+    def close(self):
+        self._unmap()
+
+
+# ─── VIEWER ────────────────────────────
+def _span(text, size, sep):
+    """'a-b' (inclusive) / 'a:b' (exclusive) / 'a' -> [start, stop) clamped to size"""
+    if not text:
+        return 0, size
+    start, has_sep, stop = text.partition(sep)
+    start = int(start) if start else 0
+    if not has_sep:
+        stop = start + 1
+    elif not stop:
+        stop = size
+    else:
+        stop = int(stop) + (sep == '-')
+    return max(0, start), min(size, stop)
+
+
+class Viewer:
+    """Colour-maps layers [a, b) x region of the newest frame into one image"""
+
+    def __init__(self, reader, layers=None, region=None, glyphs='pool', max_symbols=12,
+                 cmap='magma_r', figsize=None):
+        import matplotlib.pyplot as plt
+        from garden_render import build_lut, scatter_symbols, GlyphPool, LUT_SIZE
+        self.reader = reader
+        G = reader.grid_size
+        self.a, self.b = _span(layers, reader.num_layers, '-')
+        rows, _, cols = (region or '').partition(',')
+        self.y0, self.y1 = _span(rows, G, ':')
+        self.x0, self.x1 = _span(cols, G, ':')
+        n, h, w = self.b - self.a, self.y1 - self.y0, self.x1 - self.x0
+        self.lut, self.lut_size = build_lut(cmap), LUT_SIZE
+        self.scaled = np.empty((n, h, w), reader.dtype)
+        self.index = np.empty((n, h, w), np.intp)
+        self.rgba = np.zeros((h, n, w, 4), np.uint8)
+        self.strip = self.rgba.reshape(h, n * w, 4)
+        self.scatter = scatter_symbols
+        self.max_symbols = max_symbols
+        self.rng = np.random.default_rng()
+        self.seq = 0
+        self.seen_at = time.monotonic()
+
+        self.fig = plt.figure(figsize=figsize or (min(16, 2 + n * w * 0.12), max(2, h * 0.12)))
+        self.fig.patch.set_facecolor('black')
+        self.ax = self.fig.add_axes((0, 0, 1, 1))
+        self.ax.axis('off')
+        self.image = self.ax.imshow(self.strip, interpolation='nearest', animated=True,
+                                    extent=(-0.5, n * w - 0.5, h - 0.5, -0.5))
+        self.pool = GlyphPool(self.ax, n * max_symbols) if glyphs == 'pool' else None
+        self.artists = [self.image] + (self.pool.texts if self.pool else [])
+
+    def _reattach(self):
+        """The publisher went quiet: pick up a restarted one with the same layout"""
+        try:
+            reader = FrameReader(self.reader.name)
+        except (FileNotFoundError, ValueError):
+            return
+        old = self.reader
+        if (reader.num_layers, reader.grid_size, reader.dtype) != \
+                (old.num_layers, old.grid_size, old.dtype):
+            reader.close()
+            return
+        if reader.header[_PUBLISHER] != old.header[_PUBLISHER]:
+            old.close()
+            self.reader, self.seq = reader, 0
+        else:
+            reader.close()
+
+    def draw(self, _frame):
+        now = time.monotonic()
+        latest = self.reader.latest()
+        if latest is None or latest[0] == self.seq:
+            if now - self.seen_at > STALE_TIME:
+                self.seen_at = now
+                self._reattach()
+            return self.artists
+        seq, frame_no, neon_glow, _, blended = latest
+        src = blended[self.a:self.b, self.y0:self.y1, self.x0:self.x1]  # Shared memory, no copy
+        np.multiply(src, self.lut_size, out=self.scaled)
+        np.clip(self.scaled, 0, self.lut_size - 1, out=self.scaled)
+        self.index[...] = self.scaled
+        if not self.reader.valid(seq):
+            return self.artists  # Publisher lapped us mid-read: keep the last good frame
+        np.take(self.lut, self.index.transpose(1, 0, 2), axis=0, out=self.rgba, mode='clip')
+        self.image.set_data(self.strip)
+        self.seq, self.seen_at = seq, now
+
+        if self.pool:
+            n, w = self.b - self.a, self.x1 - self.x0
+            layer, row, col, glyph, alpha = self.scatter(
+                self.rng, n, self.reader.grid_size, frame_no, neon_glow, self.max_symbols)
+            keep = (row >= self.y0) & (row < self.y1) & (col >= self.x0) & (col < self.x1)
+            self.pool.update((col[keep] - self.x0) + layer[keep] * w, row[keep] - self.y0,
+                             glyph[keep], alpha[keep])
+        return self.artists
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show a slice of a shared neon garden framebuffer")
+    parser.add_argument('--name', default=DEFAULT_NAME, help="the publisher's --share name")
+    parser.add_argument('--layers', help="layers to show, e.g. 0-5 (default all)")
+    parser.add_argument('--region', help="cells of each layer, rows:rows,cols:cols e.g. 0:10,5:15")
+    parser.add_argument('--glyphs', choices=('pool', 'off'), default='pool')
+    parser.add_argument('--symbols', type=int, default=12, help="max glyphs per layer")
+    parser.add_argument('--fps', type=float, default=VIEWER_FPS)
+    parser.add_argument('--wait', type=float, default=30.0, help="seconds to wait for a publisher")
+    args = parser.parse_args(argv)
+
+    deadline = time.monotonic() + args.wait
+    while True:
+        try:
+            reader = FrameReader(args.name)
+            break
+        except FileNotFoundError:
+            if time.monotonic() > deadline:
+                sys.exit(f"No framebuffer '{args.name}' - start a host with --share {args.name}")
+            time.sleep(0.5)
+    print(f"Viewing '{args.name}': {reader.num_layers} layers x {reader.grid_size}")
+
+    import matplotlib.pyplot as plt
+    from garden_render import animate
+    viewer = Viewer(reader, args.layers, args.region, args.glyphs, args.symbols)
+    try:
+        plt.get_current_fig_manager().full_screen_toggle()
+    except Exception:
+        pass
+    ani = animate(viewer.fig, viewer.draw, interval=1000 / args.fps)
+    plt.show()
+    viewer.reader.close()
+
+
+if __name__ == '__main__':
+    main()
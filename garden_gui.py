@@ -0,0 +1,93 @@
+# ⋆⋆⋆ NEON GARDEN CONTROL PANEL ⋆⋆⋆
+# Tk dialogs + the performance panel. Only imported when a mode actually
+# shows them, so tkinter stays out of command-line and headless startups.
+
+import threading
+import tkinter as tk
+from tkinter import simpledialog, messagebox
+
+from garden_commands import ControlPublisher, CONTROL_RATE
+
+
+# ─── DIALOGS ───────────────────────────
+def _ask(title, prompt):
+    root = tk.Tk()
+    root.withdraw()
+    try:
+        return simpledialog.askstring(title, prompt, parent=root)
+    finally:
+        root.destroy()
+
+
+def show_error(message):
+    root = tk.Tk()
+    root.withdraw()
+    messagebox.showerror("Error", message, parent=root)
+    root.destroy()
+
+
+def ask_mode():
+    """'host' / 'client', or None if the answer was neither"""
+    mode = _ask("Mode", "Select mode [host/client]:")
+    mode = mode.strip().lower() if mode else None
+    return mode if mode in ("host", "client") else None
+
+
+def ask_host_ip():
+    ip = _ask("Host IP", "Enter host IP manually:")
+    return ip.strip() if ip else None
+
+
+# ─── PERFORMANCE GUI ────────────────────
+def create_gui(engine, submit, lockstep=lambda: False, max_rate=CONTROL_RATE):
+    """Sliders, glow toggle and collapse buttons on a daemon Tk thread
+
+    submit(cmds, apply_local=True) shares commands (see submit_local in the
+    launcher); lockstep() says whether the frame clock applies them for us.
+    Local changes go through engine.commands, never straight into the
+    engine: the simulation runs on another thread.
+    """
+    root = tk.Tk()
+    root.title("Neon Garden Controls")
+
+    # Slider drags fire dozens of ticks; the network only sees max_rate/sec
+    controls = ControlPublisher(lambda cmds: submit(cmds, apply_local=False), max_rate=max_rate)
+
+    def set_param(param, val):
+        cmd = {'type': 'adjust', 'param': param, 'value': val}
+        if not lockstep():
+            engine.commands.push(cmd)  # Local feedback on the next step
+        controls.publish(cmd)
+
+    def collapse(layers):
+        submit([{'type': 'collapse', 'layer': i} for i in layers])
+
+    tk.Label(root, text="Bloom Intensity").pack()
+    bloom_slider = tk.Scale(root, from_=0.1, to=1.0, resolution=0.05, orient='horizontal',
+                            command=lambda v: set_param('bloom', float(v)))
+    bloom_slider.set(engine.bloom_intensity)
+    bloom_slider.pack()
+
+    tk.Label(root, text="Glitch Speed").pack()
+    glitch_slider = tk.Scale(root, from_=0.01, to=0.2, resolution=0.01, orient='horizontal',
+                             command=lambda v: set_param('glitch', float(v)))
+    glitch_slider.set(engine.glitch_speed)
+    glitch_slider.pack()
+
+    # The box holds the requested state: the engine only catches up on its next step
+    neon_glow = tk.BooleanVar(root, value=engine.neon_glow)
+    neon_check = tk.Checkbutton(root, text="Neon Glow", variable=neon_glow,
+                                command=lambda: set_param('neon_glow', neon_glow.get()))
+    neon_check.pack()
+
+    collapse_frame = tk.Frame(root)
+    collapse_frame.pack()
+    for i in range(engine.num_layers):
+        tk.Button(collapse_frame, text=f"{i+1}", command=lambda l=i: collapse([l]),
+                  width=3, height=2).grid(row=i//4, column=i%4)
+
+    tk.Button(root, text="Collapse All", command=lambda: collapse(range(engine.num_layers)),
+              bg='red', fg='white', width=15).pack(pady=5)
+
+    threading.Thread(target=root.mainloop, daemon=True).start()
+    return root
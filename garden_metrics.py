@@ -0,0 +1,193 @@
+# ⋆⋆⋆ NEON GARDEN METRICS ⋆⋆⋆
+# Lightweight timing helpers: startup phases, per-stage frame times, queue
+# gauges and per-peer send latency, with a HUD summary, a JSON-lines log and
+# a /metrics endpoint. Stdlib only, so importing this costs nothing.
+
+import collections
+import json
+import threading
+import time
+
+
+class StartupTimer:
+    """Wall-clock cost of each startup phase (imports, network, window...)"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.phases = []  # (name, seconds)
+
+    def mark(self, name):
+        """Close the phase that has been running since the previous mark"""
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    @property
+    def total(self):
+        return self.last - self.start
+
+    def report(self):
+        lines = [f"  {name:<14}{seconds * 1000:9.1f} ms" for name, seconds in self.phases]
+        lines.append(f"  {'total':<14}{self.total * 1000:9.1f} ms")
+        return "Startup:\n" + "\n".join(lines)
+
+
+# ─── FRAME METRICS ─────────────────────
+WINDOW = 300          # Samples kept per series (~25 s at 80 ms)
+PERCENTILES = (50, 95, 99)
+LOG_INTERVAL = 10.0   # Seconds between lines of the metrics log
+
+
+def _noop(*args, **kwargs):
+    pass
+
+
+class RollingStats:
+    """The last `window` samples of one series, with percentiles on demand"""
+
+    def __init__(self, window=WINDOW):
+        self.samples = collections.deque(maxlen=window)
+        self.count = 0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+
+    def summary(self):
+        values = sorted(self.samples)  # Copy first: writers may append meanwhile
+        if not values:
+            return {}
+        out = {f'p{p}': values[min(len(values) - 1, len(values) * p // 100)] for p in PERCENTILES}
+        out['max'] = values[-1]
+        out['last'] = self.samples[-1] if self.samples else values[-1]
+        return out
+
+
+class FrameMetrics:
+    """Per-stage frame times (ms), queue gauges and per-peer send latency
+
+    Call begin() at the top of a frame and mark(stage) after each stage;
+    each mark records the time since the previous one on the same thread.
+    A second loop (the simulation clock) calls begin(frame=False), so its
+    stages are timed without counting towards the display frame rate. Disabled (the
+    default), begin/mark/gauge are no-ops, so instrumented code costs a
+    function call per stage.
+
+    peer_source, if set, returns the current garden_net Peers.
+    """
+
+    def __init__(self, enabled=False, window=WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self.stages = {}
+        self.gauges = {}
+        self.period = RollingStats(window)
+        self.local = threading.local()  # Per-thread time of the last begin / mark
+        self.frame_start = None
+        self.peer_source = None
+        if not enabled:
+            self.begin = self.mark = self.gauge = _noop
+
+    def _series(self, table, name):
+        stats = table.get(name)
+        if stats is None:
+            stats = table[name] = RollingStats(self.window)
+        return stats
+
+    def begin(self, frame=True):
+        now = time.perf_counter()
+        if frame:
+            if self.frame_start is not None:
+                self.period.add((now - self.frame_start) * 1000)
+            self.frame_start = now
+        self.local.last = now
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self._series(self.stages, stage).add((now - self.local.last) * 1000)
+        self.local.last = now
+
+    def gauge(self, name, value):
+        self._series(self.gauges, name).add(value)
+
+    def snapshot(self):
+        """Everything as plain data (JSON-ready)"""
+        period = self.period.summary()
+        snap = {
+            'time': time.time(),
+            'fps': round(1000 / period['p50'], 1) if period.get('p50') else 0.0,
+            'frame_ms': period,
+            'stages': {name: s.summary() for name, s in list(self.stages.items())},
+            'gauges': {name: s.summary() for name, s in list(self.gauges.items())},
+            'peers': {},
+        }
+        for peer in list(self.peer_source() if self.peer_source else ()):
+            snap['peers'][f'{peer.addr[0]}:{peer.addr[1]}'] = dict(
+                peer.latency.summary(), pending_bytes=peer.pending_bytes, dropped=peer.dropped)
+        return snap
+
+    def hud_text(self):
+        """A few short lines for the on-screen HUD"""
+        snap = self.snapshot()
+        lines = [f"{snap['fps']:.0f} fps  frame p95 {snap['frame_ms'].get('p95', 0):.1f} ms"]
+        for name, s in snap['stages'].items():
+            lines.append(f"{name:<9}{s['p50']:6.2f}{s['p95']:7.2f}{s['p99']:7.2f} ms")
+        for name, s in snap['gauges'].items():
+            lines.append(f"{name:<9}{s['last']:6g}  max {s['max']:g}")
+        if snap['peers']:
+            worst = max(p.get('p95', 0) for p in snap['peers'].values())
+            lines.append(f"{len(snap['peers'])} peers, send p95 {worst:.1f} ms")
+        return "\n".join(lines)
+
+
+def prometheus_text(snap, prefix='neon_garden'):
+    """Snapshot in the Prometheus text exposition format"""
+    lines = [f"{prefix}_fps {snap['fps']}"]
+    for name, s in snap['stages'].items():
+        for key, value in s.items():
+            lines.append(f'{prefix}_stage_ms{{stage="{name}",stat="{key}"}} {value:.4f}')
+    for name, s in snap['gauges'].items():
+        lines.append(f'{prefix}_queue{{queue="{name}"}} {s["last"]}')
+    for addr, p in snap['peers'].items():
+        for key, value in p.items():
+            lines.append(f'{prefix}_peer_send{{peer="{addr}",stat="{key}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+# ─── EXPORT ────────────────────────────
+def start_metrics_log(metrics, path, interval=LOG_INTERVAL):
+    """Append one JSON snapshot per interval to path (JSON lines), on a daemon thread"""
+    def run():
+        while True:
+            time.sleep(interval)
+            with open(path, 'a') as f:
+                f.write(json.dumps(metrics.snapshot()) + "\n")
+    threading.Thread(target=run, name="garden-metrics-log", daemon=True).start()
+
+
+def start_metrics_server(metrics, port, host='0.0.0.0'):
+    """Serve /metrics (Prometheus text) and /json on a daemon thread"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            snap = metrics.snapshot()
+            if self.path.startswith('/json'):
+                body, kind = json.dumps(snap).encode(), 'application/json'
+            else:
+                body, kind = prometheus_text(snap).encode(), 'text/plain; version=0.0.4'
+            self.send_response(200)
+            self.send_header('Content-Type', kind)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass  # Keep scrapes out of the console
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="garden-metrics", daemon=True).start()
+    print(f"Metrics on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,94 @@
+# ⋆⋆⋆ NEON GARDEN MIDI INPUT ⋆⋆⋆
+# Ports are opened ONCE. mido's callback (or one blocking reader thread when
+# the backend has no callbacks) pushes timestamped notes onto a deque; the
+# frame loop drains it and gets one 'midi' command per triggered layer.
+
+import collections
+import threading
+import time
+
+VELOCITY_FLOOR = 0.2  # Softest note still blooms this much when velocity_bloom is on
+
+
+class MidiInput:
+    """Persistent note-on listener for one, several or all MIDI input ports
+
+    ports: None for the default port, 'all' for every input, or a list of names.
+    velocity_bloom: scale each layer's bloom by the loudest note in its burst.
+    """
+
+    def __init__(self, num_layers, ports=None, velocity_bloom=False):
+        self.num_layers = num_layers
+        self.port_names = ports
+        self.velocity_bloom = velocity_bloom
+        self.events = collections.deque()  # (timestamp, layer, velocity); append/popleft are atomic
+        self.ports = []
+        self.reader = None
+        self.received = 0
+
+    def start(self):
+        """Open the port(s); returns False (quietly) when MIDI is unavailable"""
+        try:
+            import mido  # Optional: the garden runs fine without it
+            if self.port_names == 'all':
+                names = mido.get_input_names()
+            elif self.port_names:
+                names = list(self.port_names)
+            else:
+                names = [None]
+            if not names:
+                raise IOError("no MIDI input ports")
+            try:
+                self.ports = [mido.open_input(name, callback=self._on_message) for name in names]
+            except (IOError, NotImplementedError):
+                # Backend without callbacks: one blocking reader over all ports
+                self.ports = [mido.open_input(name) for name in names]
+                self.reader = threading.Thread(target=self._read_loop, name="garden-midi",
+                                               daemon=True)
+                self.reader.start()
+        except Exception as e:
+            print(f"MIDI input unavailable: {e}")
+            self.close()
+            return False
+        print(f"MIDI input: {', '.join(p.name for p in self.ports)}")
+        return True
+
+    def _on_message(self, msg):
+        if msg.type == 'note_on' and msg.velocity > 0:
+            self.events.append((time.perf_counter(), msg.note % self.num_layers, msg.velocity))
+            self.received += 1
+
+    def _read_loop(self):
+        import mido
+        for msg in mido.ports.multi_receive(self.ports, yield_ports=False, block=True):
+            self._on_message(msg)
+
+    def drain(self):
+        """Coalesce everything queued since the last call into one command per layer
+
+        Returns (commands, oldest event timestamp or None).
+        """
+        loudest = {}
+        oldest = None
+        events = self.events
+        while events:
+            ts, layer, velocity = events.popleft()
+            if oldest is None:
+                oldest = ts
+            if velocity > loudest.get(layer, 0):
+                loudest[layer] = velocity
+        cmds = []
+        for layer, velocity in loudest.items():
+            cmd = {'type': 'midi', 'layer': layer}
+            if self.velocity_bloom:
+                cmd['strength'] = round(VELOCITY_FLOOR + (1 - VELOCITY_FLOOR) * velocity / 127, 3)
+            cmds.append(cmd)
+        return cmds, oldest
+
+    def close(self):
+        for port in self.ports:
+            try:
+                port.close()
+            except Exception:
+                pass
+        self.ports = []
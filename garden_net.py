@@ -0,0 +1,384 @@
+# ⋆⋆⋆ NEON GARDEN NETWORK CORE ⋆⋆⋆
+# One asyncio event loop (on its own daemon thread) does accept, read and
+# fan-out for every peer. Each peer has its own write queue, so a phone on
+# bad Wi-Fi only ever backs up its own queue, never the broadcast.
+
+import asyncio
+import collections
+import threading
+import time
+
+from garden_metrics import RollingStats
+from garden_protocol import (PROTOCOL_VERSION, MSG_HELLO, MSG_COMMANDS, MSG_JSON,
+                             HEADER_SIZE, ProtocolError,
+                             frame_length, encode_hello, decode_hello,
+                             encode_commands, decode_commands)
+
+PORT = 5000                    # Where hosts listen unless told otherwise
+MAX_PENDING_BYTES = 64 * 1024  # Per-peer backlog before the slow-peer policy kicks in
+STALL_TIMEOUT = 10.0           # Seconds a single write may block before we drop the peer
+HANDSHAKE_TIMEOUT = 5.0
+RECONNECT_MIN = 0.25           # First retry after a lost host; doubles up to RECONNECT_MAX
+RECONNECT_MAX = 5.0
+POLICIES = ('coalesce', 'drop')
+
+
+# ─── HELPERS ───────────────────────────
+class EventLoopThread:
+    """An asyncio loop running forever on a daemon thread"""
+
+    def __init__(self, name="garden-net"):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self.thread.start()
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the loop from another thread and wait for it"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def call(self, fn, *args):
+        self.loop.call_soon_threadsafe(fn, *args)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+async def read_frame(reader):
+    header = await reader.readexactly(HEADER_SIZE)
+    body = await reader.readexactly(frame_length(header))
+    return body[0], body[1:]
+
+
+def coalesce_commands(cmds):
+    """Shrink a backlog: last value per adjust param, one midi/collapse per layer"""
+    seen = set()
+    kept = []
+    for cmd in reversed(cmds):
+        kind = cmd.get('type')
+        if kind == 'adjust':
+            key = (kind, cmd.get('param'))
+        elif kind in ('midi', 'collapse'):
+            key = (kind, cmd.get('layer'))
+        else:
+            kept.append(cmd)
+            continue
+        if key not in seen:
+            seen.add(key)
+            kept.append(cmd)
+    kept.reverse()
+    return kept
+
+
+# ─── PEER ──────────────────────────────
+class Peer:
+    """One connection's write side: a queue of encoded batches plus a writer task
+
+    When the backlog passes max_pending bytes, 'coalesce' folds it down to
+    the latest state (see coalesce_commands) and 'drop' discards the oldest
+    batches. Either way the newest commands always survive. Entries pushed
+    with cmds=None (lockstep ticks, snapshots) are never shed; a peer that
+    can't keep up with those hits STALL_TIMEOUT and is dropped instead.
+    """
+
+    def __init__(self, reader, writer, policy='coalesce', max_pending=MAX_PENDING_BYTES):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown slow-peer policy {policy!r}")
+        self.reader = reader
+        self.writer = writer
+        self.policy = policy
+        self.max_pending = max_pending
+        self.addr = writer.get_extra_info('peername') or ('?', 0)
+        self.queue = collections.deque()  # (cmds, encoded bytes)
+        self.pending_bytes = 0
+        self.dropped = 0
+        self.queued_at = 0.0
+        self.latency = RollingStats()  # ms from enqueue until the kernel took the bytes
+        self.wakeup = asyncio.Event()
+        self.idle = asyncio.Event()  # Set while everything queued has reached the kernel
+        self.idle.set()
+        self.task = None
+
+    def push(self, cmds, data):
+        if not self.queue:
+            self.queued_at = time.perf_counter()
+        self.idle.clear()
+        self.queue.append((cmds, data))
+        self.pending_bytes += len(data)
+        if self.pending_bytes > self.max_pending:
+            self._shed()
+        self.wakeup.set()
+
+    def _shed(self):
+        if self.policy == 'coalesce' and all(cmds is not None for cmds, _ in self.queue):
+            backlog = [c for batch, _ in self.queue for c in batch]
+            kept = coalesce_commands(backlog)
+            data = encode_commands(kept)
+            self.dropped += len(backlog) - len(kept)
+            self.queue = collections.deque([(kept, data)])
+            self.pending_bytes = len(data)
+        for entry in list(self.queue)[:-1]:
+            if self.pending_bytes <= self.max_pending:
+                break
+            cmds, data = entry
+            if cmds is not None:
+                self.queue.remove(entry)
+                self.pending_bytes -= len(data)
+                self.dropped += len(cmds)
+
+    async def write_loop(self):
+        try:
+            while True:
+                await self.wakeup.wait()
+                self.wakeup.clear()
+                if not self.queue:
+                    continue
+                data = b''.join(d for _, d in self.queue)
+                queued_at = self.queued_at
+                self.queue.clear()
+                self.pending_bytes = 0
+                self.writer.write(data)
+                # Backpressure: only this peer waits; new commands pile up in
+                # its queue (and get shed) meanwhile
+                await asyncio.wait_for(self.writer.drain(), STALL_TIMEOUT)
+                self.latency.add((time.perf_counter() - queued_at) * 1000)
+                if not self.queue:
+                    self.idle.set()
+        except (OSError, asyncio.TimeoutError) as e:
+            print(f"Dropped stalled peer {self.addr[0]}: {e or type(e).__name__}")
+            self.writer.transport.abort()  # Also ends the read side
+        finally:
+            self.idle.set()
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self.write_loop())
+        return self.task
+
+    def close(self):
+        if self.task:
+            self.task.cancel()
+        self.writer.close()
+
+    async def flush_and_close(self, timeout=STALL_TIMEOUT):
+        """Send everything queued, then close (close() alone drops the queue)"""
+        try:
+            await asyncio.wait_for(self.idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.close()
+        try:
+            await asyncio.wait_for(self.writer.wait_closed(), timeout)
+        except (OSError, asyncio.TimeoutError):
+            pass
+
+
+# ─── SERVER ────────────────────────────
+class GardenServer:
+    """Host side: accepts clients, hands their commands to on_commands, fans out broadcasts
+
+    on_commands(cmds, peer) is called on the network thread. on_join(), if
+    given, returns encoded frames every new client gets before anything else.
+    on_frame(msg_type, payload, peer), if given, gets every other message type.
+    """
+
+    def __init__(self, host, port, on_commands, policy='coalesce',
+                 max_pending=MAX_PENDING_BYTES, relay=False, on_join=None, on_frame=None):
+        self.host = host
+        self.port = port
+        self.on_commands = on_commands
+        self.on_join = on_join
+        self.on_frame = on_frame
+        self.policy = policy
+        self.max_pending = max_pending
+        self.relay = relay
+        self.peers = set()
+        self.net = None
+        self.server = None
+
+    def start(self, net=None):
+        """Start listening (returns once the socket is bound)"""
+        self.net = net or EventLoopThread()
+        self.net.run(self._start())
+        return self
+
+    async def _start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                 reuse_address=True)
+
+    @property
+    def client_count(self):
+        return len(self.peers)
+
+    def broadcast(self, cmds):
+        """Thread-safe: queue commands for every connected client"""
+        self.net.call(self._broadcast, list(cmds))
+
+    def broadcast_frame(self, data):
+        """Thread-safe: queue an already-encoded frame that must reach everyone"""
+        self.net.call(self._push_all, None, data)
+
+    def _push_all(self, cmds, data, exclude=None):
+        for peer in self.peers:
+            if peer is not exclude:
+                peer.push(cmds, data)
+
+    def _broadcast(self, cmds, exclude=None):
+        if not cmds or not self.peers:
+            return
+        data = encode_commands(cmds)  # Encode once, same bytes for everyone
+        self._push_all(cmds, data, exclude)
+
+    async def _handle(self, reader, writer):
+        peer = Peer(reader, writer, self.policy, self.max_pending)
+        try:
+            # Version handshake: client speaks first, we always answer with ours
+            msg_type, payload = await asyncio.wait_for(read_frame(reader), HANDSHAKE_TIMEOUT)
+            if msg_type != MSG_HELLO:
+                raise ProtocolError("no HELLO")
+            version = decode_hello(payload)
+            writer.write(encode_hello())
+            if version != PROTOCOL_VERSION:
+                raise ProtocolError(f"client speaks protocol v{version}")
+
+            if self.on_join:
+                for data in self.on_join():
+                    peer.push(None, data)
+            self.peers.add(peer)
+            peer.start()
+            while True:
+                msg_type, payload = await read_frame(reader)
+                if msg_type not in (MSG_COMMANDS, MSG_JSON):
+                    if self.on_frame:
+                        self.on_frame(msg_type, payload, peer)
+                    continue
+                cmds = decode_commands(msg_type, payload)
+                if cmds:
+                    self.on_commands(cmds, peer)
+                    if self.relay:
+                        self._broadcast(cmds, exclude=peer)
+        except asyncio.IncompleteReadError:
+            pass
+        except (OSError, ProtocolError, asyncio.TimeoutError) as e:
+            print(f"Dropped {peer.addr[0]}: {e or type(e).__name__}")
+        finally:
+            self.peers.discard(peer)
+            peer.close()
+
+    def stop(self, flush=False):
+        """Close the listener and every client; flush=True sends their queues first"""
+        async def _stop():
+            self.server.close()
+            peers = list(self.peers)
+            if flush:
+                await asyncio.gather(*(peer.flush_and_close() for peer in peers))
+            for peer in peers:
+                peer.close()
+        self.net.run(_stop())
+
+
+# ─── CLIENT ────────────────────────────
+class GardenClient:
+    """Display/controller side: one connection to the host
+
+    on_commands(cmds) is called on the network thread with host broadcasts;
+    on_frame(msg_type, payload), if given, gets every other message type.
+
+    With reconnect, a lost link is retried with backoff until close();
+    resolve(), if given, runs first on each retry (in an executor) and may
+    return a new (host, port). on_close() is called whenever the link drops.
+    """
+
+    def __init__(self, host, port, on_commands, policy='coalesce', max_pending=MAX_PENDING_BYTES,
+                 on_frame=None, reconnect=False, resolve=None, on_close=None):
+        self.host = host
+        self.port = port
+        self.on_commands = on_commands
+        self.on_frame = on_frame
+        self.reconnect = reconnect
+        self.resolve = resolve
+        self.on_close = on_close
+        self.policy = policy
+        self.max_pending = max_pending
+        self.peer = None
+        self.net = None
+        self.closed = threading.Event()
+
+    def connect(self, timeout=HANDSHAKE_TIMEOUT, net=None):
+        self.net = net or EventLoopThread()
+        self.net.run(self._connect(), timeout)
+        return self
+
+    async def _connect(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        writer.write(encode_hello())
+        msg_type, payload = await asyncio.wait_for(read_frame(reader), HANDSHAKE_TIMEOUT)
+        if msg_type != MSG_HELLO:
+            writer.close()
+            raise ProtocolError("host did not answer HELLO")
+        version = decode_hello(payload)
+        if version != PROTOCOL_VERSION:
+            writer.close()
+            raise ProtocolError(f"host speaks protocol v{version}, we speak v{PROTOCOL_VERSION}")
+        self.closed.clear()
+        self.peer = Peer(reader, writer, self.policy, self.max_pending)
+        self.peer.start()
+        asyncio.get_running_loop().create_task(self._read_loop(self.peer))
+
+    async def _read_loop(self, peer):
+        try:
+            while True:
+                msg_type, payload = await read_frame(peer.reader)
+                if msg_type in (MSG_COMMANDS, MSG_JSON):
+                    self.on_commands(decode_commands(msg_type, payload))
+                elif self.on_frame:
+                    self.on_frame(msg_type, payload)
+        except (OSError, ProtocolError, asyncio.IncompleteReadError) as e:
+            print(f"Lost host: {e or type(e).__name__}")
+        finally:
+            peer.close()
+            self.closed.set()
+            if self.on_close:
+                self.on_close()
+            if self.reconnect:
+                asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        delay = RECONNECT_MIN
+        loop = asyncio.get_running_loop()
+        while self.reconnect:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX)
+            if self.resolve:
+                found = await loop.run_in_executor(None, self.resolve)
+                if found:
+                    self.host, self.port = found
+            try:
+                await asyncio.wait_for(self._connect(), HANDSHAKE_TIMEOUT)
+            except (OSError, ProtocolError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+                continue
+            print(f"Reconnected to {self.host}:{self.port}")
+            return
+
+    def send(self, cmds):
+        """Thread-safe: queue commands for the host"""
+        cmds = list(cmds)
+        self.net.call(self._send, cmds)
+
+    def send_frame(self, data):
+        """Thread-safe: queue an already-encoded frame that must reach the host"""
+        self.net.call(self._send_frame, data)
+
+    def _send_frame(self, data):
+        if self.peer and not self.closed.is_set():
+            self.peer.push(None, data)
+
+    def _send(self, cmds):
+        if self.peer and not self.closed.is_set():
+            self.peer.push(cmds, encode_commands(cmds))
+
+    def close(self, flush=False):
+        """flush=True waits until everything queued has been sent"""
+        self.reconnect = False
+        if self.peer and flush:
+            self.net.run(self.peer.flush_and_close())
+        elif self.peer:
+            self.net.call(self.peer.close)
@@ -0,0 +1,212 @@
+# ⋆⋆⋆ NEON GARDEN WIRE PROTOCOL ⋆⋆⋆
+# Length-prefixed frames over TCP. Stdlib only.
+#
+#   frame   = u32 body length | body
+#   body    = u8 message type | payload
+#   HELLO   = b'NGDN' | u16 protocol version          (first frame each way)
+#   COMMANDS= u16 count | count * record               (batch of commands)
+#   record  = u8 kind | u16 layer-or-param | f32 value (7 bytes, network order;
+#             value is the bloom strength for midi, unused for collapse)
+#   JSON    = utf-8 JSON command (anything a record can't carry)
+#   TICK    = u32 frame | COMMANDS payload             (lockstep: commands for that frame)
+#   SNAPSHOT= see garden_sync                          (lockstep keyframe for late joiners)
+#   HALO    = see garden_wall                          (boundary ghost layer between wall nodes)
+
+import json
+import math
+import struct
+
+from garden_commands import MAX_PENDING_BLOOMS
+
+PROTOCOL_VERSION = 4
+MAGIC = b'NGDN'
+
+MSG_HELLO = 0x01
+MSG_COMMANDS = 0x02
+MSG_JSON = 0x03
+MSG_TICK = 0x04
+MSG_SNAPSHOT = 0x05
+MSG_HALO = 0x06
+
+CMD_MIDI = 1
+CMD_COLLAPSE = 2
+CMD_ADJUST = 3
+
+# Wire ids for 'adjust' params; bool params come back as bool
+PARAM_IDS = {'bloom': 0, 'glitch': 1, 'neon_glow': 2}
+PARAM_NAMES = {v: k for k, v in PARAM_IDS.items()}
+BOOL_PARAMS = {'neon_glow'}
+
+MAX_FRAME = 1 << 20  # Anything bigger is a broken or hostile peer
+MAX_BATCH = 0xFFFF
+
+_LEN = struct.Struct('!I')
+HEADER_SIZE = _LEN.size
+_HELLO = struct.Struct('!4sH')
+_COUNT = struct.Struct('!H')
+_RECORD = struct.Struct('!BHf')
+_FRAME_NO = struct.Struct('!I')
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+# ─── ENCODING ──────────────────────────
+def frame(msg_type, payload=b''):
+    return _LEN.pack(len(payload) + 1) + bytes((msg_type,)) + payload
+
+
+def encode_hello(version=PROTOCOL_VERSION):
+    return frame(MSG_HELLO, _HELLO.pack(MAGIC, version))
+
+
+def pack_command(cmd):
+    """7-byte record for a command, or None if it needs the JSON fallback"""
+    kind = cmd.get('type')
+    try:
+        if kind == 'midi':
+            return _RECORD.pack(CMD_MIDI, cmd['layer'], float(cmd.get('strength', 1.0)))
+        if kind == 'collapse':
+            return _RECORD.pack(CMD_COLLAPSE, cmd['layer'], 0.0)
+        if kind == 'adjust' and cmd['param'] in PARAM_IDS:
+            return _RECORD.pack(CMD_ADJUST, PARAM_IDS[cmd['param']], float(cmd['value']))
+    except (KeyError, TypeError, struct.error):
+        pass
+    return None
+
+
+def _records(cmd):
+    """Wire records for one command: a midi 'count' goes out as that many notes"""
+    rec = pack_command(cmd)
+    if rec is None:
+        return None
+    if cmd.get('type') == 'midi':
+        return [rec] * max(1, min(int(cmd.get('count', 1)), MAX_PENDING_BLOOMS))
+    return [rec]
+
+
+def _records_frame(records):
+    return frame(MSG_COMMANDS, _COUNT.pack(len(records)) + b''.join(records))
+
+
+def encode_commands(cmds):
+    """Pack any number of commands into as few frames as possible, in order"""
+    out = []
+    records = []
+    for cmd in cmds:
+        recs = _records(cmd)
+        if recs is None:
+            if records:
+                out.append(_records_frame(records))
+                records = []
+            out.append(frame(MSG_JSON, json.dumps(cmd).encode()))
+            continue
+        for rec in recs:
+            records.append(rec)
+            if len(records) == MAX_BATCH:
+                out.append(_records_frame(records))
+                records = []
+    if records:
+        out.append(_records_frame(records))
+    return b''.join(out)
+
+
+def encode_tick(frame_no, cmds):
+    """Lockstep tick: binary records only (commands that can't pack are dropped)"""
+    records = [r for cmd in cmds for r in _records(cmd) or ()][:MAX_BATCH]
+    return frame(MSG_TICK, _FRAME_NO.pack(frame_no) + _COUNT.pack(len(records)) + b''.join(records))
+
+
+# ─── DECODING ──────────────────────────
+def frame_length(header, offset=0):
+    """Body length from a frame header, validated"""
+    (length,) = _LEN.unpack_from(header, offset)
+    if length < 1 or length > MAX_FRAME:
+        raise ProtocolError(f"bad frame length {length}")
+    return length
+
+
+def decode_hello(payload):
+    try:
+        magic, version = _HELLO.unpack(payload)
+    except struct.error:
+        raise ProtocolError("malformed HELLO")
+    if magic != MAGIC:
+        raise ProtocolError("not a neon garden peer")
+    return version
+
+
+def unpack_command(kind, ident, value):
+    if kind in (CMD_MIDI, CMD_ADJUST) and not math.isfinite(value):
+        raise ProtocolError(f"non-finite value in command record {kind}/{ident}")
+    if kind == CMD_MIDI:
+        if value == 1.0:
+            return {'type': 'midi', 'layer': ident}
+        return {'type': 'midi', 'layer': ident, 'strength': round(value, 6)}
+    if kind == CMD_COLLAPSE:
+        return {'type': 'collapse', 'layer': ident}
+    if kind == CMD_ADJUST and ident in PARAM_NAMES:
+        param = PARAM_NAMES[ident]
+        value = bool(value) if param in BOOL_PARAMS else round(value, 6)
+        return {'type': 'adjust', 'param': param, 'value': value}
+    raise ProtocolError(f"unknown command record {kind}/{ident}")
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value):
+    """int or finite float (JSON NaN/Infinity would poison the whole stack)"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def check_command(cmd):
+    """A JSON command as the engine expects it, or ProtocolError"""
+    if not isinstance(cmd, dict):
+        raise ProtocolError("JSON command is not an object")
+    kind = cmd.get('type')
+    if kind in ('midi', 'collapse'):
+        if not _is_int(cmd.get('layer')):
+            raise ProtocolError(f"{kind} command needs an integer layer")
+        if kind == 'midi':
+            if not _is_number(cmd.get('strength', 1.0)):
+                raise ProtocolError("midi strength must be a finite number")
+            if not _is_int(cmd.get('count', 1)) or cmd.get('count', 1) < 1:
+                raise ProtocolError("midi count must be a positive integer")
+    elif kind == 'adjust':
+        if not isinstance(cmd.get('param'), str):
+            raise ProtocolError("adjust command needs a param name")
+        if not _is_number(cmd.get('value')):
+            raise ProtocolError("adjust value must be a finite number")
+    else:
+        raise ProtocolError(f"unknown command type {kind!r}")
+    return cmd
+
+
+def decode_commands(msg_type, payload):
+    """Commands carried by one COMMANDS or JSON frame"""
+    if msg_type == MSG_JSON:
+        try:
+            cmd = json.loads(payload.decode())
+        except ValueError:
+            raise ProtocolError("malformed JSON command")
+        return [check_command(cmd)]
+    if msg_type != MSG_COMMANDS:
+        return []
+    if len(payload) < _COUNT.size:
+        raise ProtocolError("truncated COMMANDS")
+    (count,) = _COUNT.unpack_from(payload)
+    body = memoryview(payload)[_COUNT.size:]
+    if len(body) != count * _RECORD.size:
+        raise ProtocolError("COMMANDS length mismatch")
+    return [unpack_command(*rec) for rec in _RECORD.iter_unpack(body)]
+
+
+def decode_tick(payload):
+    """(frame number, commands) from a TICK payload"""
+    if len(payload) < _FRAME_NO.size:
+        raise ProtocolError("truncated TICK")
+    (frame_no,) = _FRAME_NO.unpack_from(payload)
+    return frame_no, decode_commands(MSG_COMMANDS, payload[_FRAME_NO.size:])
@@ -0,0 +1,101 @@
+# ⋆⋆⋆ NEON GARDEN QUALITY GOVERNOR ⋆⋆⋆
+# Watches the real frame period and walks a ladder of quality levels to
+# hold a target frame rate: one level down as soon as frames run late, one
+# level up only after a stretch with clear headroom. A level that had to be
+# abandoned right after climbing to it is retried later and later.
+
+import math
+import time
+
+TARGET_FPS = 12.5   # FuncAnimation interval=80
+DEFAULT_LEVEL = 1   # The old hard-coded mobile look
+LEVELS = (
+    # Richest first. near = share of layers (front first) refreshed every frame,
+    # the rest every far_every frames; stride 2 = half resolution; ghosts = update
+    # the ghost layers every n-th frame (only without lockstep).
+    dict(max_symbols=20, near=1.0, far_every=1, stride=1, ghosts=1),
+    dict(max_symbols=12, near=1.0, far_every=1, stride=1, ghosts=1),
+    dict(max_symbols=8, near=1.0, far_every=1, stride=1, ghosts=1),
+    dict(max_symbols=5, near=0.5, far_every=2, stride=1, ghosts=1),
+    dict(max_symbols=5, near=0.5, far_every=4, stride=2, ghosts=1),
+    dict(max_symbols=3, near=0.34, far_every=4, stride=2, ghosts=2),
+    dict(max_symbols=0, near=0.25, far_every=8, stride=2, ghosts=2),
+)
+SLOW_RATIO = 1.15    # Period above target * this: step down
+HEADROOM_RATIO = 0.5  # Frame work below target * this ...
+HEADROOM_TIME = 3.0   # ... for this many seconds: step up
+SETTLE_TIME = 1.0     # Seconds to measure a new level before judging it
+BACKOFF = 5.0         # Base wait before retrying a level we fell off (doubles, max 120 s)
+EMA = 0.1
+
+
+class QualityGovernor:
+    """Adjusts renderer (and, when allowed, engine) load to hold target_fps
+
+    Call frame_start() first thing in the frame callback and frame_end()
+    last. allow_sim lets it thin ghost updates, which changes the
+    simulation, so leave it off whenever screens must stay in lockstep.
+    """
+
+    def __init__(self, renderer, engine, target_fps=TARGET_FPS, level=DEFAULT_LEVEL,
+                 allow_sim=False, levels=LEVELS):
+        self.renderer = renderer
+        self.engine = engine
+        self.target = 1.0 / target_fps
+        self.allow_sim = allow_sim
+        self.levels = levels
+        self.period = None
+        self.work = None
+        self.started = None
+        self.headroom_since = None
+        self.hold_until = 0.0
+        self.retry_at = {}   # level -> earliest time to climb back to it
+        self.backoff = {}    # level -> current backoff
+        self.changes = 0
+        self.level = None
+        self.apply(level)
+
+    def apply(self, level):
+        self.level = max(0, min(level, len(self.levels) - 1))
+        q = self.levels[self.level]
+        self.renderer.set_quality(max_symbols=q['max_symbols'],
+                                  near_layers=math.ceil(q['near'] * self.engine.num_layers),
+                                  far_every=q['far_every'], stride=q['stride'])
+        if self.allow_sim:
+            self.engine.ghost_interval = q['ghosts']
+        self.period = self.work = None
+        self.headroom_since = None
+        self.hold_until = time.monotonic() + SETTLE_TIME
+        self.changes += 1
+
+    def frame_start(self):
+        now = time.perf_counter()
+        if self.started is not None:
+            period = now - self.started
+            self.period = period if self.period is None else self.period + EMA * (period - self.period)
+        self.started = now
+
+    def frame_end(self):
+        work = time.perf_counter() - self.started
+        self.work = work if self.work is None else self.work + EMA * (work - self.work)
+        now = time.monotonic()
+        if now < self.hold_until or self.period is None:
+            return
+        if self.period > self.target * SLOW_RATIO:
+            if self.level < len(self.levels) - 1:
+                self._fell_off(self.level, now)
+                self.apply(self.level + 1)
+        elif self.work < self.target * HEADROOM_RATIO and self.level > 0:
+            if self.headroom_since is None:
+                self.headroom_since = now
+            elif (now - self.headroom_since >= HEADROOM_TIME
+                  and now >= self.retry_at.get(self.level - 1, 0.0)):
+                self.apply(self.level - 1)
+        else:
+            self.headroom_since = None
+
+    def _fell_off(self, level, now):
+        """Remember that level was too rich; each repeat doubles the wait before retrying"""
+        wait = self.backoff.get(level, BACKOFF / 2) * 2
+        self.backoff[level] = min(wait, 120.0)
+        self.retry_at[level] = now + self.backoff[level]
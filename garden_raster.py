@@ -0,0 +1,406 @@
+# ⋆⋆⋆ NEON GARDEN RASTER BACKEND ⋆⋆⋆
+# The garden straight to RGB pixels with numpy: colour LUT, nearest-neighbour
+# upscale and pre-rasterized glyph sprites, into a framebuffer that a sink
+# owns. No figure, no canvas, no FuncAnimation; matplotlib is only imported
+# once to rasterize the glyphs, and not at all when they are cached.
+#
+#   python collaborative_neon_garden.py --render raster --target-fps 60
+#   python garden_raster.py --out - --fps 60 | ffplay -f rawvideo -pixel_format rgb24 \
+#       -video_size 1440x120 -framerate 60 -i -
+#   python garden_raster.py --out /dev/shm/garden.rgb --fps 0 --frames 2000   # benchmark
+#
+# Sinks: 'tk' (a window), '-' (raw rgb24 on stdout) or a file path, which is
+# memory-mapped: b'NGRB' | u32 height | u32 width | u32 channels | u64 frame count | pixels
+# (little-endian; the count goes up after each complete frame).
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+from garden_metrics import FrameMetrics
+
+SIGILS = ["⊱","⟡","⚚","⩀","⦿"]
+EMOJIS = ["🌸","✨","🫧","🌼","💫","🍃","🌙","⚡","🪞"]
+GLYPHS = SIGILS + EMOJIS
+SIGIL_COLOR = (0.2, 1.0, 1.0)
+EMOJI_COLOR = (1.0, 0.8, 0.2)
+GLYPH_COLORS = np.array([SIGIL_COLOR] * len(SIGILS) + [EMOJI_COLOR] * len(EMOJIS))
+MIN_SYMBOLS = 5
+MAX_SYMBOLS = 12   # Fewer on mobile
+LUT_SIZE = 256  # Same quantization matplotlib uses for a default colormap
+SPRITE_CELLS = 2.5  # Glyph sprite edge, in grid cells (matches fontsize 12 on screen)
+CELL_PX = 6        # Raster backend: pixels per grid cell (12 x 20 garden -> 1440 x 120)
+SPRITE_CACHE = os.path.join(os.path.expanduser('~'), '.neon_garden_sprites.npz')
+
+# matplotlib's magma at 17 evenly spaced points; interpolating them is within
+# a few levels of the real 256-entry table
+MAGMA_STOPS = ('000004', '0A0822', '1D1147', '36106B', '51127C', '6A1C81', '832681', '9C2E7F',
+               'B73779', 'D0416F', 'E75263', 'F56B5C', 'FC8961', 'FEA772', 'FEC488', 'FDE2A3',
+               'FCFDBF')
+
+_MMAP_HEADER = struct.Struct('<4sIIIQ')
+
+
+def scatter_symbols(rng, num_layers, grid_size, frame, neon_glow, max_symbols=MAX_SYMBOLS):
+    """Random glyph layout for one frame as flat arrays: (layer, row, col, glyph, alpha)"""
+    low = min(MIN_SYMBOLS, max_symbols)
+    counts = rng.integers(low, max_symbols + 1, size=num_layers)
+    layer = np.repeat(np.arange(num_layers), counts)
+    n = layer.size
+    row = rng.integers(0, grid_size, size=n)
+    col = rng.integers(0, grid_size, size=n)
+    glyph = rng.integers(0, len(GLYPHS), size=n)
+    alpha = 0.5 + rng.random(n) * 0.5
+    if neon_glow:
+        alpha += np.sin(rng.random(n) * frame * 0.1) * 0.2
+    np.clip(alpha, 0, 1, out=alpha)
+    return layer, row, col, glyph, alpha
+
+
+def raster_lut(cmap='magma_r', size=LUT_SIZE):
+    """Colormap as a (size, 3) uint8 RGB table; magma / magma_r without matplotlib"""
+    if cmap in ('magma', 'magma_r'):
+        stops = np.array([[int(h[i:i + 2], 16) for i in (0, 2, 4)] for h in MAGMA_STOPS], float)
+        if cmap.endswith('_r'):
+            stops = stops[::-1]
+        x = np.linspace(0, 1, size)
+        xp = np.linspace(0, 1, len(stops))
+        return np.stack([np.interp(x, xp, stops[:, k]) for k in range(3)], axis=1).round().astype(np.uint8)
+    import matplotlib.pyplot as plt
+    return (plt.get_cmap(cmap)(np.linspace(0, 1, size))[:, :3] * 255 + 0.5).astype(np.uint8)
+
+
+# ─── GLYPH SPRITES ─────────────────────
+class GlyphSprites:
+    """Rasterize each glyph once into a coverage mask and stamp it into RGBA frames"""
+
+    def __init__(self, size_px):
+        self.size_px = max(int(size_px), 4)
+        self.masks = {}
+        self.colors = np.round(GLYPH_COLORS * 255).astype(np.float32)
+        self.approximate = False  # True once a glyph had to fall back to a plain dot
+
+    def mask(self, glyph):
+        m = self.masks.get(glyph)
+        if m is None:
+            m = self.masks[glyph] = self._rasterize(GLYPHS[glyph])
+        return m
+
+    def _rasterize(self, symbol):
+        # Local imports: only sprite users pay for the Agg figure machinery
+        try:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+        except ImportError:
+            self.approximate = True
+            return self._dot()
+        px = self.size_px
+        fig = Figure(figsize=(px / 72, px / 72), dpi=72)
+        canvas = FigureCanvasAgg(fig)
+        fig.patch.set_alpha(0)
+        fig.text(0.5, 0.5, symbol, ha='center', va='center', fontsize=px * 0.75, color='white')
+        canvas.draw()
+        return np.asarray(canvas.buffer_rgba())[..., 3].astype(np.float32) / 255
+
+    def _dot(self):
+        """Soft round spot for when no font rasterizer is available"""
+        r = (np.arange(self.size_px) - (self.size_px - 1) / 2) / (self.size_px / 2)
+        dist = np.hypot(r[:, None], r[None, :])
+        return (np.clip(1 - dist, 0, 1) ** 1.5).astype(np.float32)
+
+    def prerender(self, cache=SPRITE_CACHE):
+        """Rasterize every glyph now, so the first frames don't stall
+
+        With cache, masks from an earlier run are reused and matplotlib
+        isn't imported at all.
+        """
+        key = f'px{self.size_px}'
+        try:
+            with np.load(cache) as saved:
+                stored = dict(saved)
+        except (OSError, ValueError, TypeError):
+            stored = {}
+        if len(stored.get(key, ())) == len(GLYPHS):
+            self.masks = dict(enumerate(stored[key]))
+            return self
+        for g in range(len(GLYPHS)):
+            self.mask(g)
+        if cache and not self.approximate:
+            stored[key] = np.stack([self.masks[g] for g in range(len(GLYPHS))])
+            try:
+                np.savez_compressed(cache, **stored)
+            except OSError:
+                pass
+        return self
+
+    def stamp(self, frame, glyph, alpha, cy, cx):
+        """Alpha-blend one glyph centred at pixel (cy, cx) into an RGB(A) uint8 frame"""
+        m = self.mask(glyph)
+        s = m.shape[0]
+        y0, x0 = cy - s // 2, cx - s // 2
+        y1, x1 = max(y0, 0), max(x0, 0)
+        y2, x2 = min(y0 + s, frame.shape[0]), min(x0 + s, frame.shape[1])
+        if y1 >= y2 or x1 >= x2:
+            return
+        a = m[y1 - y0:y2 - y0, x1 - x0:x2 - x0, None] * alpha
+        region = frame[y1:y2, x1:x2, :3]
+        region[...] = region + (self.colors[glyph] - region) * a
+
+    def stamp_all(self, frame, rows, cols, glyphs, alphas, cell_px):
+        half = cell_px // 2
+        for r, c, g, a in zip(rows, cols, glyphs, alphas):
+            self.stamp(frame, int(g), float(a), int(r) * cell_px + half, int(c) * cell_px + half)
+
+
+# ─── SINKS ─────────────────────────────
+# Each sink owns `frame`, the (height, width, 3) uint8 buffer the renderer
+# draws into, and shows / ships it on present().
+
+class PipeSink:
+    """Raw rgb24 frames to a binary stream (stdout for ffmpeg / ffplay)"""
+
+    def __init__(self, shape, stream=None):
+        self.frame = np.zeros(shape, np.uint8)
+        self.stream = stream or sys.stdout.buffer
+
+    def present(self):
+        self.stream.write(self.frame.data)  # The buffer itself, no tobytes()
+
+    def close(self):
+        try:
+            self.stream.flush()
+        except BrokenPipeError:
+            pass
+
+
+class MmapSink:
+    """Frames written in place into a memory-mapped file (a viewer process maps it too)"""
+
+    def __init__(self, shape, path):
+        height, width, channels = shape
+        size = _MMAP_HEADER.size + height * width * channels
+        with open(path, 'w+b') as f:
+            f.truncate(size)
+            self.map = mmap.mmap(f.fileno(), size)
+        self.map[:_MMAP_HEADER.size] = _MMAP_HEADER.pack(b'NGRB', height, width, channels, 0)
+        self.frame = np.ndarray(shape, np.uint8, buffer=self.map, offset=_MMAP_HEADER.size)
+        self.count = np.ndarray(1, '<u8', buffer=self.map, offset=_MMAP_HEADER.size - 8)
+        self.path = path
+
+    def present(self):
+        self.count[0] += 1
+
+    def close(self):
+        del self.frame, self.count
+        self.map.close()
+
+
+class TkSink:
+    """A Tk window showing frames through one PhotoImage
+
+    Tk can't borrow our memory, so every frame costs one copy into Tcl; the
+    renderer draws straight into the PPM buffer so that copy is the only one.
+    """
+
+    def __init__(self, shape, title="Neon Garden"):
+        import tkinter as tk
+        height, width, _ = shape
+        header = f'P6 {width} {height} 255\n'.encode()
+        self.ppm = bytearray(len(header) + height * width * 3)
+        self.ppm[:len(header)] = header
+        self.frame = np.frombuffer(self.ppm, np.uint8, offset=len(header)).reshape(shape)
+        self.root = tk.Tk()
+        self.root.title(title)
+        self.root.configure(bg='black')
+        self.photo = tk.PhotoImage(width=width, height=height)
+        tk.Label(self.root, image=self.photo, bd=0, bg='black').pack(expand=True)
+        self.fullscreen = False
+        self.root.bind('<Escape>', lambda e: self.root.destroy())
+        self.root.bind('<F11>', lambda e: self.toggle_fullscreen())
+        self.root.protocol('WM_DELETE_WINDOW', self.root.destroy)
+
+    def toggle_fullscreen(self):
+        self.fullscreen = not self.fullscreen
+        self.root.attributes('-fullscreen', self.fullscreen)
+
+    def present(self):
+        self.photo.configure(data=bytes(self.ppm), format='PPM')
+
+    def run(self, step, fps, frames=0):
+        """Tk owns the main loop here: step(frame_no) on a root.after timer"""
+        interval = 1.0 / fps if fps else 0.0
+        count = 0
+
+        def tick():
+            nonlocal count
+            started = time.perf_counter()
+            step(count)
+            count += 1
+            if frames and count >= frames:
+                self.root.destroy()
+                return
+            wait = interval - (time.perf_counter() - started)
+            self.root.after(max(1, int(wait * 1000)), tick)
+
+        self.root.after(0, tick)
+        self.root.mainloop()
+
+    def close(self):
+        pass
+
+
+def make_sink(output, shape, stream=None):
+    """'tk' = window, '-' = stdout (or stream), anything else = memory-mapped file at that path"""
+    if output == 'tk':
+        return TkSink(shape)
+    if output == '-':
+        return PipeSink(shape, stream)
+    return MmapSink(shape, output)
+
+
+def run(sink, step, fps, frames=0):
+    """Call step(frame_no) at fps (0 = flat out) until frames are done or the sink goes away"""
+    if hasattr(sink, 'run'):
+        return sink.run(step, fps, frames)
+    interval = 1.0 / fps if fps else 0.0
+    next_frame = time.perf_counter()
+    count = 0
+    try:
+        while not frames or count < frames:
+            step(count)
+            count += 1
+            next_frame += interval
+            now = time.perf_counter()
+            if next_frame > now:
+                time.sleep(next_frame - now)
+            else:
+                next_frame = now  # Running late: carry on, never burst
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass  # Encoder / viewer went away
+    finally:
+        sink.close()
+
+
+# ─── RENDERER ──────────────────────────
+def frame_shape(num_layers, grid_size, cell_px=CELL_PX):
+    """(height, width, 3) of a raster frame: every layer side by side"""
+    return grid_size * cell_px, num_layers * grid_size * cell_px, 3
+
+
+class RasterRenderer:
+    """Layer stack -> RGB uint8 framebuffer with numpy only
+
+    Same quality knobs as the matplotlib renderers (stride is not
+    supported). draw() renders into sink.frame and presents it; glyphs are
+    'sprites' or 'off'.
+    """
+
+    def __init__(self, engine, sink=None, cell_px=CELL_PX, cmap='magma_r', glyphs='sprites',
+                 max_symbols=MAX_SYMBOLS, metrics=None):
+        if glyphs not in ('sprites', 'off'):
+            raise ValueError(f"RasterRenderer can't draw glyphs={glyphs!r}")
+        self.engine = engine
+        self.sink = sink
+        self.metrics = metrics or FrameMetrics()
+        self.glyphs = glyphs
+        self.cell_px = cell_px
+        self.max_symbols = self.symbol_capacity = max_symbols
+        self.near_layers = engine.num_layers
+        self.far_every = 1
+        self.stale = False
+        self.rng = np.random.default_rng()
+        L, G = engine.num_layers, engine.grid_size
+        self.lut = raster_lut(cmap)
+        self.scaled = np.empty((L, G, G), dtype=engine.dtype)
+        self.index = np.empty((L, G, G), dtype=np.intp)
+        self.atlas = np.empty((G, L, G, 3), dtype=np.uint8)  # (row, layer, col): reshapes to the strip
+        self.strip = self.atlas.reshape(G, L * G, 3)
+        shape = frame_shape(L, G, cell_px)
+        self.frame = sink.frame if sink else np.empty(shape, dtype=np.uint8)
+        if self.frame.shape != shape:
+            raise ValueError(f"sink frame is {self.frame.shape}, need {shape}")
+        self.cells = self.frame.reshape(G, cell_px, L * G, cell_px, 3)
+        self.sprites = GlyphSprites(cell_px * SPRITE_CELLS).prerender() if glyphs == 'sprites' else None
+
+    def set_quality(self, max_symbols=None, near_layers=None, far_every=None, stride=None):
+        """Live quality knobs (see garden_quality); stride (resolution) is not supported"""
+        if max_symbols is not None:
+            self.max_symbols = min(max_symbols, self.symbol_capacity)
+        if near_layers is not None:
+            self.near_layers = max(1, min(near_layers, self.engine.num_layers))
+        if far_every is not None:
+            self.far_every = max(1, far_every)
+
+    def compose(self, count=None):
+        """Blend, depth-fade and colour-map the first count layers, then upscale the strip"""
+        n = self.engine.num_layers if count is None else count
+        blended = self.engine.blend(n)[:n]
+        np.multiply(blended, LUT_SIZE, out=self.scaled[:n])
+        np.clip(self.scaled[:n], 0, LUT_SIZE - 1, out=self.scaled[:n])
+        self.index[:n] = self.scaled[:n]
+        np.take(self.lut, self.index[:n].transpose(1, 0, 2), axis=0, out=self.atlas[:, :n],
+                mode='clip')
+        self.cells[...] = self.strip[:, None, :, None, :]  # Also wipes last frame's glyphs
+        return self.frame
+
+    def render(self, frame):
+        full = self.stale or frame % self.far_every == 0
+        self.compose(None if full else self.near_layers)
+        self.stale = False
+        self.metrics.mark('compose')
+        if self.sprites:
+            layer, row, col, glyph, alpha = scatter_symbols(
+                self.rng, self.engine.num_layers, self.engine.grid_size, frame,
+                self.engine.neon_glow, self.max_symbols)
+            self.sprites.stamp_all(self.frame, row, col + layer * self.engine.grid_size,
+                                   glyph, alpha, self.cell_px)
+            self.metrics.mark('glyphs')
+        return self.frame
+
+    def draw(self, frame):
+        """Render and present; returns no artists (there is no figure)"""
+        self.render(frame)
+        if self.sink:
+            self.sink.present()
+        self.metrics.mark('upload')
+        return []
+
+
+# ─── STANDALONE ────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Neon garden on the raster backend (no matplotlib)")
+    parser.add_argument('--out', default='tk', help="'tk', '-' (rgb24 on stdout) or a file to mmap")
+    parser.add_argument('--fps', type=float, default=60.0, help="0 = as fast as possible")
+    parser.add_argument('--frames', type=int, default=0, help="stop after this many (0 = never)")
+    parser.add_argument('--layers', type=int, default=12)
+    parser.add_argument('--grid', type=int, default=20)
+    parser.add_argument('--cell-px', type=int, default=CELL_PX)
+    parser.add_argument('--glyphs', choices=('sprites', 'off'), default='sprites')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    from garden_engine import GardenEngine
+    engine = GardenEngine(args.layers, args.grid, seed=args.seed)
+    shape = frame_shape(args.layers, args.grid, args.cell_px)
+    sink = make_sink(args.out, shape)
+    renderer = RasterRenderer(engine, sink, args.cell_px, glyphs=args.glyphs)
+    print(f"Raster {shape[1]}x{shape[0]} to {args.out}", file=sys.stderr)
+
+    def step(frame):
+        engine.step()
+        renderer.draw(frame)
+
+    started = time.perf_counter()
+    run(sink, step, args.fps, args.frames)
+    elapsed = time.perf_counter() - started
+    print(f"{engine.frame} frames in {elapsed:.2f} s ({engine.frame / max(elapsed, 1e-9):.0f} fps)",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+# ⋆⋆⋆ NEON GARDEN HEADLESS RELAY ⋆⋆⋆
+# Host mode for a box in a closet: TCP server, LAN discovery and command
+# relay, optionally the authoritative lockstep simulation. No matplotlib,
+# Tk or MIDI; numpy is only imported with --simulate.
+#
+#   python garden_relay.py                               # relay commands between clients
+#   python garden_relay.py --simulate --seed 7           # + one shared lockstep garden
+#   python garden_relay.py --simulate --layers 17 --grid 30 --status 300
+#   python garden_relay.py --simulate --record shows/tonight.ngs.gz   # archive the show
+#   python garden_relay.py --simulate --share garden   # + local projectors via garden_framebuffer.py
+
+import argparse
+import signal
+import threading
+import time
+
+from garden_discovery import get_local_ip, Announcer
+from garden_metrics import FrameMetrics, start_metrics_server
+from garden_net import GardenServer, POLICIES, PORT
+
+HOST = '0.0.0.0'
+STATUS_INTERVAL = 60.0  # Seconds between status lines
+
+
+class Relay:
+    """Server + discovery (+ lockstep host) with nothing on screen
+
+    Without simulate, client commands are fanned out to every other client
+    and each display evolves its own garden. With simulate, commands go
+    through a LockstepHost stepped on a fixed clock here, and clients follow
+    its ticks (so nothing is relayed twice).
+    """
+
+    def __init__(self, port=PORT, simulate=False, layers=12, grid_size=20, float32=False,
+                 seed=None, policy='coalesce', metrics=None, record=None, share=None,
+                 rate=None, announce=True):
+        self.port = port
+        self.announce = announce
+        self.metrics = metrics or FrameMetrics()
+        self.engine = None
+        self.sync = None
+        if simulate:
+            import numpy as np
+            from garden_engine import GardenEngine, SIM_RATE
+            from garden_sync import LockstepHost
+            self.engine = GardenEngine(layers, grid_size, seed=seed, rate=rate or SIM_RATE,
+                                       dtype=np.float32 if float32 else np.float64)
+            self.sync = LockstepHost(self.engine)
+        self.recorder = None
+        if record:
+            if not simulate:
+                raise ValueError("recording needs --simulate (a bare relay has no garden)")
+            from garden_session import SessionRecorder
+            self.recorder = SessionRecorder(record, self.engine)
+        self.framebuffer = None
+        if share:
+            if not simulate:
+                raise ValueError("sharing frames needs --simulate (a bare relay has no garden)")
+            from garden_framebuffer import FramePublisher
+            self.framebuffer = FramePublisher(share, layers, grid_size, self.engine.dtype)
+        self.server = GardenServer(HOST, port, on_commands=self.on_commands, policy=policy,
+                                   relay=self.sync is None,
+                                   on_join=self.sync.join_frames if self.sync else None)
+        self.stopped = threading.Event()
+        self.clock = None
+        self.announcer = None
+        self.started_at = None
+        self.received = 0
+        self.metrics.peer_source = lambda: self.server.peers
+
+    def on_commands(self, cmds, peer):
+        self.received += len(cmds)
+        if self.sync:
+            self.sync.submit(cmds)
+
+    def start(self):
+        self.server.start()
+        self.started_at = time.monotonic()
+        if self.sync:
+            self.sync.publish = self.server.broadcast_frame
+            from garden_clock import SimClock
+            self.clock = SimClock(self._step, self.engine.rate).start()
+        engine = self.engine
+        self.announcer = Announcer(self.port, engine and engine.num_layers, engine and engine.grid_size,
+                                   lockstep=self.sync is not None, rate=engine and engine.rate,
+                                   dtype=engine and engine.dtype.name)
+        if self.announce:
+            self.announcer.start()
+        kind = "lockstep host" if self.sync else "relay"
+        print(f"Headless {kind} listening on {get_local_ip()}:{self.port} "
+              f"(session {self.announcer.session})", flush=True)
+        return self
+
+    def _step(self):
+        """One simulation step on the clock thread"""
+        self.metrics.begin()
+        if self.recorder:
+            self.recorder.tick(lockstep=True)
+        self.sync.step()
+        if self.framebuffer:
+            self.framebuffer.publish(self.engine)
+        self.metrics.mark('lockstep')
+
+    def status(self):
+        peers = list(self.server.peers)
+        hours = (time.monotonic() - self.started_at) / 3600
+        line = (f"{time.strftime('%Y-%m-%d %H:%M:%S')} up {hours:.1f} h, {len(peers)} clients, "
+                f"{self.received} commands in, {sum(p.dropped for p in peers)} shed")
+        if self.engine:
+            line += f", frame {self.engine.frame}"
+        return line
+
+    def run(self, status_interval=STATUS_INTERVAL):
+        """Block until stop() (or SIGTERM / Ctrl-C in main), printing a status line now and then"""
+        while not self.stopped.wait(status_interval):
+            print(self.status(), flush=True)
+
+    def stop(self):
+        self.stopped.set()
+        self.announcer.stop()
+        self.server.stop()
+        if self.clock:
+            self.clock.stop()  # Joins the clock thread, so no step can race the final writes
+        if self.recorder:
+            self.recorder.close()
+        if self.framebuffer:
+            self.framebuffer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless neon garden host (no display)")
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--simulate', action='store_true',
+                        help="run the authoritative lockstep garden here")
+    parser.add_argument('--layers', type=int, default=12)
+    parser.add_argument('--grid', type=int, default=20)
+    parser.add_argument('--float32', action='store_true')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--sim-rate', type=float,
+                        help="with --simulate: garden steps per second, default the engine's "
+                             "SIM_RATE (clients follow)")
+    parser.add_argument('--policy', choices=POLICIES, default='coalesce',
+                        help="what to do with a slow client's backlog")
+    parser.add_argument('--status', type=float, default=STATUS_INTERVAL,
+                        help="seconds between status lines")
+    parser.add_argument('--no-announce', dest='announce', action='store_false',
+                        help="stay off LAN discovery (clients need the address)")
+    parser.add_argument('--metrics-port', type=int,
+                        help="serve /metrics (Prometheus) and /json on this port")
+    parser.add_argument('--record', metavar='FILE',
+                        help="with --simulate: log the show for garden_session.py replay")
+    parser.add_argument('--share', metavar='NAME',
+                        help="with --simulate: publish frames for garden_framebuffer.py viewers")
+    args = parser.parse_args(argv)
+    if (args.record or args.share) and not args.simulate:
+        parser.error("--record and --share need --simulate")
+
+    metrics = FrameMetrics(enabled=bool(args.metrics_port))
+    relay = Relay(args.port, args.simulate, args.layers, args.grid, args.float32,
+                  args.seed, args.policy, metrics, args.record, args.share, args.sim_rate,
+                  args.announce).start()
+    if args.metrics_port:
+        start_metrics_server(metrics, args.metrics_port)
+    signal.signal(signal.SIGTERM, lambda *_: relay.stopped.set())  # systemd / docker stop
+    try:
+        relay.run(args.status)
+    except KeyboardInterrupt:
+        pass
+    relay.stop()
+    print("Relay stopped")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+# ⋆⋆⋆ NEON GARDEN RENDERERS ⋆⋆⋆
+# Matplotlib front-ends for a GardenEngine. Every renderer returns ALL of its
+# animated artists from draw() so FuncAnimation(blit=True) redraws them.
+
+import time
+
+import numpy as np
+import matplotlib.pyplot as plt
+import matplotlib.animation as animation
+
+from garden_metrics import FrameMetrics
+from garden_raster import (GLYPHS, GLYPH_COLORS, MAX_SYMBOLS, LUT_SIZE, SPRITE_CELLS,
+                           GlyphSprites, scatter_symbols)
+
+FONTSIZE = 12
+HUD_INTERVAL = 0.5  # Seconds between HUD text refreshes
+
+
+def build_lut(cmap='magma_r', size=LUT_SIZE):
+    """Colormap as a (size, 4) uint8 RGBA lookup table"""
+    cmap = plt.get_cmap(cmap)
+    return (cmap(np.linspace(0, 1, size)) * 255 + 0.5).astype(np.uint8)
+
+
+class GlyphPool:
+    """Fixed set of pre-created Text artists, re-used every frame"""
+
+    def __init__(self, ax, size, fontsize=FONTSIZE):
+        self.texts = [ax.text(0, 0, '', fontsize=fontsize, ha='center', va='center',
+                              animated=True, visible=False)
+                      for _ in range(size)]
+        self.glyph = [-1] * size
+
+    def update(self, xs, ys, glyphs, alphas):
+        n = min(len(xs), len(self.texts))
+        for k in range(n):
+            t, g = self.texts[k], int(glyphs[k])
+            t.set_position((xs[k], ys[k]))
+            if g != self.glyph[k]:
+                # Only touch text/colour when the glyph actually changes
+                t.set_text(GLYPHS[g])
+                t.set_color(GLYPH_COLORS[g])
+                self.glyph[k] = g
+            t.set_alpha(float(alphas[k]))
+            t.set_visible(True)
+        for t in self.texts[n:]:
+            t.set_visible(False)
+        return self.texts
+
+
+class AxesRenderer:
+    """One axes + imshow per layer (the original layout); glyphs 'pool' or 'off'"""
+
+    def __init__(self, engine, figsize=(16, 3), cmap='magma_r', glyphs='pool',
+                 max_symbols=MAX_SYMBOLS, metrics=None):
+        if glyphs not in ('pool', 'off'):
+            raise ValueError(f"AxesRenderer can't draw glyphs={glyphs!r}")
+        self.engine = engine
+        self.metrics = metrics or FrameMetrics()
+        self.glyphs = glyphs
+        self.max_symbols = self.symbol_capacity = max_symbols
+        self.near_layers = engine.num_layers
+        self.far_every = 1
+        self.rng = np.random.default_rng()
+        self.fig, axes = plt.subplots(1, engine.num_layers, figsize=figsize, squeeze=False)
+        self.axes = list(axes[0])
+        self.fig.subplots_adjust(wspace=0, hspace=0)
+        for ax in self.axes: ax.axis('off')
+
+        # Pre-create imshow artists for speed
+        blended = engine.blend()
+        self.images = [ax.imshow(blended[i], cmap=cmap, vmin=0, vmax=1, animated=True)
+                       for i, ax in enumerate(self.axes)]
+        self.pools = [GlyphPool(ax, max_symbols if glyphs == 'pool' else 0) for ax in self.axes]
+        self.artists = self.images + [t for p in self.pools for t in p.texts]
+
+    def set_quality(self, max_symbols=None, near_layers=None, far_every=None, stride=None):
+        """Live quality knobs (see garden_quality); stride (resolution) is atlas-only"""
+        if max_symbols is not None:
+            self.max_symbols = min(max_symbols, self.symbol_capacity)
+        if near_layers is not None:
+            self.near_layers = max(1, min(near_layers, self.engine.num_layers))
+        if far_every is not None:
+            self.far_every = max(1, far_every)
+
+    def draw(self, frame):
+        n = len(self.images) if frame % self.far_every == 0 else self.near_layers
+        blended = self.engine.blend(n)
+        for i, im in enumerate(self.images[:n]):
+            im.set_data(blended[i])
+        self.metrics.mark('compose')
+        if self.glyphs == 'off':
+            return self.artists
+
+        layer, row, col, glyph, alpha = scatter_symbols(
+            self.rng, self.engine.num_layers, self.engine.grid_size, frame,
+            self.engine.neon_glow, self.max_symbols)
+        bounds = np.searchsorted(layer, np.arange(self.engine.num_layers + 1))
+        for i, pool in enumerate(self.pools):
+            s = slice(bounds[i], bounds[i + 1])
+            pool.update(col[s], row[s], glyph[s], alpha[s])
+        self.metrics.mark('glyphs')
+        return self.artists
+
+
+class AtlasRenderer:
+    """All layers side by side in ONE RGBA image on ONE axes
+
+    glyphs='pool' draws symbols with pooled Text artists; glyphs='sprites'
+    stamps cached glyph rasters straight into the atlas, which is then
+    upscaled to cell_px pixels per grid cell so the sprites have room.
+
+    Quality knobs (set_quality): fewer symbols, far layers (index >=
+    near_layers) refreshed only every far_every frames, and stride 2 to
+    colour-map every other cell (half resolution, pool/off glyphs only).
+    """
+
+    def __init__(self, engine, figsize=(16, 3), cmap='magma_r', glyphs='pool',
+                 cell_px=None, max_symbols=MAX_SYMBOLS, metrics=None):
+        self.engine = engine
+        self.metrics = metrics or FrameMetrics()
+        self.glyphs = glyphs
+        self.max_symbols = self.symbol_capacity = max_symbols
+        self.near_layers = engine.num_layers
+        self.far_every = 1
+        self.stride = 1
+        self.stale = False
+        self.rng = np.random.default_rng()
+        L, G = engine.num_layers, engine.grid_size
+        self.lut = build_lut(cmap)
+        self.buffers = {}
+        self.scaled, self.index, self.atlas, self.strip = self._buffers(1)
+
+        self.cell_px = cell_px or (8 if glyphs == 'sprites' else 1)
+        if self.cell_px > 1:
+            c = self.cell_px
+            self.frame = np.empty((G * c, L * G * c, 4), dtype=np.uint8)
+            self.cells = self.frame.reshape(G, c, L * G, c, 4)
+        else:
+            self.frame = self.strip
+        self.sprites = GlyphSprites(self.cell_px * SPRITE_CELLS) if glyphs == 'sprites' else None
+
+        self.fig = plt.figure(figsize=figsize)
+        self.ax = self.fig.add_axes((0, 0, 1, 1))
+        self.ax.axis('off')
+        # Extent keeps data coordinates in grid cells whatever cell_px / stride is
+        self.image = self.ax.imshow(self.compose(), interpolation='nearest', animated=True,
+                                    extent=(-0.5, L * G - 0.5, G - 0.5, -0.5))
+        self.pool = GlyphPool(self.ax, L * max_symbols) if glyphs == 'pool' else None
+        self.artists = [self.image] + (self.pool.texts if self.pool else [])
+
+    def _buffers(self, stride):
+        """(scaled, index, atlas, strip) for one resolution, made on first use"""
+        if stride not in self.buffers:
+            L, G = self.engine.num_layers, -(-self.engine.grid_size // stride)
+            # Atlas is stored (row, layer, col, rgba) so a reshape gives the
+            # (G, L*G, 4) strip without copying
+            atlas = np.empty((G, L, G, 4), dtype=np.uint8)
+            self.buffers[stride] = (np.empty((L, G, G), dtype=self.engine.dtype),
+                                    np.empty((L, G, G), dtype=np.intp),
+                                    atlas, atlas.reshape(G, L * G, 4))
+        return self.buffers[stride]
+
+    def set_quality(self, max_symbols=None, near_layers=None, far_every=None, stride=None):
+        """Live quality knobs (see garden_quality); what this renderer can't do is clamped"""
+        if max_symbols is not None:
+            self.max_symbols = min(max_symbols, self.symbol_capacity)
+        if near_layers is not None:
+            self.near_layers = max(1, min(near_layers, self.engine.num_layers))
+        if far_every is not None:
+            self.far_every = max(1, far_every)
+        if stride is not None and self.cell_px == 1 and stride != self.stride:
+            self.stride = stride
+            self.stale = True  # New buffers: compose every layer once
+
+    def compose(self, count=None):
+        """Blend, depth-fade and colour-map the first count layers (default all) into the atlas"""
+        n = self.engine.num_layers if count is None else count
+        s = self.stride
+        scaled, index, atlas, strip = self._buffers(s)
+        blended = self.engine.blend(n)[:n, ::s, ::s]
+        np.multiply(blended, LUT_SIZE, out=scaled[:n])
+        np.clip(scaled[:n], 0, LUT_SIZE - 1, out=scaled[:n])
+        index[:n] = scaled[:n]
+        np.take(self.lut, index[:n].transpose(1, 0, 2), axis=0, out=atlas[:, :n], mode='clip')
+        if self.cell_px > 1:
+            self.cells[...] = self.strip[:, None, :, None, :]
+            return self.frame
+        return strip
+
+    def draw(self, frame):
+        full = self.stale or frame % self.far_every == 0
+        image = self.compose(None if full else self.near_layers)
+        self.stale = False
+        self.metrics.mark('compose')
+        if self.glyphs != 'off':
+            layer, row, col, glyph, alpha = scatter_symbols(
+                self.rng, self.engine.num_layers, self.engine.grid_size, frame,
+                self.engine.neon_glow, self.max_symbols)
+            col = col + layer * self.engine.grid_size
+            if self.sprites:
+                self.sprites.stamp_all(self.frame, row, col, glyph, alpha, self.cell_px)
+            else:
+                self.pool.update(col, row, glyph, alpha)
+            self.metrics.mark('glyphs')
+        self.image.set_data(image)
+        self.metrics.mark('upload')
+        return self.artists
+
+
+class Hud:
+    """Frame metrics drawn over the garden (refreshed every HUD_INTERVAL)"""
+
+    def __init__(self, ax, metrics, interval=HUD_INTERVAL):
+        self.metrics = metrics
+        self.interval = interval
+        self.next_update = 0.0
+        self.text = ax.text(0.005, 0.98, '', transform=ax.transAxes, ha='left', va='top',
+                            family='monospace', fontsize=7, color='white', animated=True,
+                            bbox=dict(facecolor='black', alpha=0.5, linewidth=0))
+
+    def update(self):
+        now = time.monotonic()
+        if now >= self.next_update:
+            self.text.set_text(self.metrics.hud_text())
+            self.next_update = now + self.interval
+        return self.text
+
+
+class TimedAnimation(animation.FuncAnimation):
+    """FuncAnimation that also times the blit to screen as the 'canvas' stage"""
+
+    def __init__(self, fig, func, metrics, **kwargs):
+        self.metrics = metrics
+        super().__init__(fig, func, **kwargs)
+
+    def _post_draw(self, framedata, blit):
+        super()._post_draw(framedata, blit)
+        self.metrics.mark('canvas')
+
+
+def animate(fig, func, interval=80, metrics=None):
+    """Blitted animation of fig; the timed variant only when metrics are on"""
+    if metrics and metrics.enabled:
+        return TimedAnimation(fig, func, metrics, interval=interval, blit=True,
+                              cache_frame_data=False)
+    return animation.FuncAnimation(fig, func, interval=interval, blit=True, cache_frame_data=False)
+
+
+RENDERERS = {'atlas': AtlasRenderer, 'axes': AxesRenderer}
+
+
+def make_renderer(mode, engine, **kwargs):
+    return RENDERERS[mode](engine, **kwargs)
@@ -0,0 +1,380 @@
+# ⋆⋆⋆ NEON GARDEN SESSION RECORDER / REPLAY ⋆⋆⋆
+# Records a show as its seed, one keyframe and every command the engine
+# applied (midi, collapse, adjust incl. GUI sliders), stamped with frame and
+# time. Replay re-simulates it headlessly and renders on the Agg backend with
+# a pool of frame workers, far faster than the live 80 ms clock.
+#
+#   python collaborative_neon_garden.py --mode host --record show.ngs.gz
+#   python garden_session.py info show.ngs.gz
+#   python garden_session.py render show.ngs.gz --out frames/ --workers 4
+#   python garden_session.py render show.ngs.gz --raw - | \
+#       ffmpeg -f rawvideo -pix_fmt rgb24 -s 1600x300 -r 12.5 -i - show.mp4
+#
+# File (gzip when the name ends in .gz):
+#   session = b'NGSS' | u16 version | u32 meta length | JSON meta | SNAPSHOT frame | entry*
+#   entry   = f32 seconds since start | TICK frame    (commands applied on that frame)
+# The last entry is an empty TICK for the frame the recording stopped on.
+#
+# Commands are recorded on the frame the simulation thread applied them, so
+# input it deferred or coalesced replays where it landed. Lockstep sessions
+# replay bit for bit; free-running ones are close but not exact, because
+# slider values are stored as float32.
+
+import argparse
+import atexit
+import gzip
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from garden_engine import GardenEngine
+from garden_protocol import MSG_SNAPSHOT, MSG_TICK, HEADER_SIZE, ProtocolError, \
+    encode_tick, decode_tick, frame_length
+from garden_sync import SNAPSHOT_INTERVAL, quantize_state, encode_snapshot, load_snapshot, step_frame
+
+MAGIC = b'NGSS'
+VERSION = 1
+FLUSH_INTERVAL = SNAPSHOT_INTERVAL  # Frames between file flushes (a crash loses ~5 s at most)
+
+_HEADER = struct.Struct('!4sHI')
+_SECONDS = struct.Struct('!f')
+
+
+def _open(path, mode):
+    return gzip.open(path, mode) if str(path).endswith('.gz') else open(path, mode)
+
+
+# ─── RECORDING ─────────────────────────
+class SessionRecorder:
+    """Logs every command an engine applies, from the next keyframe boundary on
+
+    Call tick(lockstep) at the top of every frame, before commands and
+    evolve. Recording starts on the first frame that is a multiple of
+    SNAPSHOT_INTERVAL with a quantized keyframe (the same snap lockstep does
+    there anyway), so replay starts from exactly the live state. If the
+    lockstep flag changes (a client got its host's keyframe) the file is
+    started over.
+    """
+
+    def __init__(self, path, engine, fps=None):
+        self.path = path
+        self.engine = engine
+        self.fps = fps or engine.rate  # One entry per simulation step
+        self.lock = threading.Lock()
+        self.file = None
+        self.lockstep = None
+        self.started_at = None
+        self.pending = {}  # frame -> (seconds, [cmds])
+        self.entries = 0
+        self.last_flush = 0
+        engine.recorder = self
+        atexit.register(self.close)
+
+    def record(self, frame_no, cmd):
+        """Engine hook (any thread): cmd was just applied on frame_no"""
+        if self.file is None:
+            return
+        with self.lock:
+            entry = self.pending.get(frame_no)
+            if entry is None:
+                entry = self.pending[frame_no] = (time.monotonic() - self.started_at, [])
+            entry[1].append(cmd)
+
+    def tick(self, lockstep=False):
+        frame_no = self.engine.frame
+        if self.file is not None and lockstep != self.lockstep:
+            print(f"Recording: lockstep {'on' if lockstep else 'off'}, starting {self.path} over")
+            self._finish(write_end=False)
+        if self.file is None:
+            if frame_no % SNAPSHOT_INTERVAL == 0:
+                self._begin(lockstep)
+            return
+        self._write(before=frame_no)
+        if frame_no - self.last_flush >= FLUSH_INTERVAL:
+            self.file.flush()
+            self.last_flush = frame_no
+
+    def _begin(self, lockstep):
+        engine = self.engine
+        snapshot = encode_snapshot(engine, *quantize_state(engine))
+        meta = json.dumps({
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'seed': engine.seed,
+            'layers': engine.num_layers,
+            'grid': engine.grid_size,
+            'dtype': engine.dtype.str,
+            'lockstep': lockstep,
+            'start': engine.frame,
+            'fps': self.fps,
+        }).encode()
+        self.file = _open(self.path, 'wb')
+        self.file.write(_HEADER.pack(MAGIC, VERSION, len(meta)) + meta + snapshot)
+        self.lockstep = lockstep
+        self.last_flush = engine.frame
+        self.entries = 0
+        self.started_at = time.monotonic()
+        print(f"Recording to {self.path} from frame {engine.frame}")
+
+    def _write(self, before=None):
+        """Write out every frame older than before (all frames if None)"""
+        with self.lock:
+            done = sorted(f for f in self.pending if before is None or f < before)
+            entries = [(f, self.pending.pop(f)) for f in done]
+        for frame_no, (seconds, cmds) in entries:
+            self.file.write(_SECONDS.pack(seconds) + encode_tick(frame_no, cmds))
+        self.entries += len(entries)
+
+    def _finish(self, write_end=True):
+        self._write()
+        if write_end:
+            seconds = time.monotonic() - self.started_at
+            self.file.write(_SECONDS.pack(seconds) + encode_tick(self.engine.frame, []))
+        with self.lock:
+            self.file.close()
+            self.file = None
+            self.pending = {}
+
+    def close(self):
+        """Write the end marker and close (safe to call twice; also runs at exit)"""
+        if self.file is not None:
+            self._finish()
+            print(f"Recording saved to {self.path} ({self.entries} command frames)")
+
+
+# ─── READING ───────────────────────────
+class Session:
+    """A recording loaded into memory: meta, keyframe and commands per frame"""
+
+    def __init__(self, path):
+        with _open(path, 'rb') as f:
+            data = f.read()
+        try:
+            magic, version, meta_len = _HEADER.unpack_from(data)
+            if magic != MAGIC:
+                raise ProtocolError(f"{path} is not a neon garden session")
+            if version > VERSION:
+                raise ProtocolError(f"session version {version} is newer than this script")
+            pos = _HEADER.size
+            self.meta = json.loads(data[pos:pos + meta_len])
+            pos += meta_len
+            self.snapshot, pos = self._frame(data, pos, MSG_SNAPSHOT)
+            self.ticks = {}   # frame -> [cmds]
+            self.times = {}   # frame -> seconds since start
+            self.end = self.meta['start']
+            while pos < len(data):
+                (seconds,) = _SECONDS.unpack_from(data, pos)
+                payload, pos = self._frame(data, pos + _SECONDS.size, MSG_TICK)
+                frame_no, cmds = decode_tick(payload)
+                self.ticks.setdefault(frame_no, []).extend(cmds)  # A late Tk apply adds a 2nd entry
+                self.times.setdefault(frame_no, seconds)
+                self.end = max(self.end, frame_no)
+        except ProtocolError:
+            raise
+        except (struct.error, ValueError) as e:
+            raise ProtocolError(f"truncated or malformed session: {e}")
+
+    @staticmethod
+    def _frame(data, pos, msg_type):
+        length = frame_length(data, pos)
+        body = data[pos + HEADER_SIZE:pos + HEADER_SIZE + length]
+        if len(body) != length or body[0] != msg_type:
+            raise ProtocolError("truncated session entry")
+        return body[1:], pos + HEADER_SIZE + length
+
+    @property
+    def start(self):
+        return self.meta['start']
+
+    @property
+    def command_count(self):
+        return sum(len(c) for c in self.ticks.values())
+
+    def engine(self):
+        """A GardenEngine in the recorded state at the first frame"""
+        meta = self.meta
+        engine = GardenEngine(meta['layers'], meta['grid'], dtype=np.dtype(meta['dtype']),
+                              seed=meta['seed'], rate=meta['fps'])
+        load_snapshot(engine, self.snapshot)
+        return engine
+
+    def replay(self, stop=None):
+        """Re-simulate; yields the engine after each frame (engine.frame = frames done)"""
+        engine = self.engine()
+        stop = self.end if stop is None else min(stop, self.end)
+        while engine.frame < stop:
+            cmds = self.ticks.get(engine.frame, [])
+            if self.meta['lockstep']:
+                step_frame(engine, cmds)
+            else:
+                for cmd in cmds:
+                    engine.apply_command(cmd)
+                engine.evolve()
+            yield engine
+
+
+# ─── OFFLINE RENDERING ─────────────────
+_worker = {}
+
+
+def frame_range(session, first=None, last=None):
+    """(first, last] clamped to the recording"""
+    first = session.start if first is None else max(first, session.start)
+    last = session.end if last is None else min(last, session.end)
+    return first, last
+
+
+def _init_worker(meta, figsize, dpi, render_mode, glyphs, max_symbols, out_dir):
+    """Pool initializer: a private Agg figure + renderer per worker process"""
+    import warnings
+    import matplotlib
+    matplotlib.use('Agg')
+    warnings.filterwarnings('ignore', message='Glyph .* missing from font')  # Once per frame otherwise
+    matplotlib.rcParams['figure.dpi'] = dpi
+    from garden_render import make_renderer
+    engine = GardenEngine(meta['layers'], meta['grid'], dtype=np.dtype(meta['dtype']))
+    renderer = make_renderer(render_mode, engine, figsize=figsize, glyphs=glyphs,
+                             max_symbols=max_symbols)
+    canvas = renderer.fig.canvas
+    canvas.draw()  # Everything static, once; frames are blitted over it like on screen
+    _worker.update(engine=engine, renderer=renderer, seed=meta['seed'] or 0, out_dir=out_dir,
+                   background=canvas.copy_from_bbox(renderer.fig.bbox))
+
+
+def _render_frame(job):
+    """Draw one frame; PNG into out_dir (returns None) or raw RGB bytes"""
+    frame_no, layers, ghosts, neon_glow = job
+    engine, renderer = _worker['engine'], _worker['renderer']
+    engine.layers[...] = layers
+    engine.memory_ghosts[...] = ghosts
+    engine.neon_glow = neon_glow
+    renderer.rng = np.random.default_rng([_worker['seed'], frame_no])  # Same glyphs on every run
+    artists = renderer.draw(frame_no)
+    canvas = renderer.fig.canvas
+    canvas.restore_region(_worker['background'])
+    for artist in artists:
+        artist.axes.draw_artist(artist)
+    rgb = np.asarray(canvas.buffer_rgba())[..., :3]
+    if _worker['out_dir'] is None:
+        return rgb.tobytes()
+    import matplotlib.image
+    matplotlib.image.imsave(os.path.join(_worker['out_dir'], f'frame_{frame_no:06d}.png'), rgb)
+    return None
+
+
+def render(session, out_dir=None, raw=None, workers=None, first=None, last=None, every=1,
+           figsize=(16, 3), dpi=100, render_mode='atlas', glyphs='sprites', max_symbols=12):
+    """Re-simulate the session and render frames (first, last] to out_dir or raw
+
+    raw is a binary file (stdout for a pipe) that gets packed RGB frames in
+    order. Simulation runs here; drawing and encoding run on `workers`
+    processes (0 = in this process), at most a few frames in flight.
+    """
+    first, last = frame_range(session, first, last)
+    init = (session.meta, figsize, dpi, render_mode, glyphs, max_symbols, out_dir)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    workers = (os.cpu_count() or 1) if workers is None else workers
+
+    pool = None
+    if workers:
+        import multiprocessing as mp
+        pool = mp.get_context('spawn').Pool(workers, _init_worker, init)
+    else:
+        _init_worker(*init)
+    in_flight = deque()
+    done = 0
+    started = time.perf_counter()
+
+    def finish(result):
+        nonlocal done
+        data = result.get() if pool else result
+        if raw is not None:
+            raw.write(data)
+        done += 1
+        if done % 100 == 0:
+            rate = done / (time.perf_counter() - started)
+            print(f"  {done} frames, {rate:.1f} fps ({rate / session.meta['fps']:.1f}x real time)",
+                  file=sys.stderr)
+
+    try:
+        for engine in session.replay(stop=last):
+            frame_no = engine.frame
+            if frame_no <= first or (frame_no - first - 1) % every:
+                continue
+            job = (frame_no, engine.layers.copy(), engine.memory_ghosts.copy(), engine.neon_glow)
+            if pool is None:
+                finish(_render_frame(job))
+                continue
+            in_flight.append(pool.apply_async(_render_frame, (job,)))
+            if len(in_flight) >= workers * 4:
+                finish(in_flight.popleft())
+        while in_flight:
+            finish(in_flight.popleft())
+    finally:
+        if pool:
+            pool.terminate()
+    return done, time.perf_counter() - started
+
+
+# ─── COMMAND LINE ──────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or render a recorded neon garden session")
+    sub = parser.add_subparsers(dest='action', required=True)
+    info = sub.add_parser('info', help="print what a recording holds")
+    info.add_argument('session')
+    out = sub.add_parser('render', help="re-simulate and render frames headlessly")
+    out.add_argument('session')
+    dest = out.add_mutually_exclusive_group(required=True)
+    dest.add_argument('--out', help="directory for frame_NNNNNN.png")
+    dest.add_argument('--raw', help="file for packed RGB frames, '-' = stdout (pipe to ffmpeg)")
+    out.add_argument('--workers', type=int, help="render processes (0 = none, default one per core)")
+    out.add_argument('--first', type=int, help="first frame (default: start of recording)")
+    out.add_argument('--last', type=int, help="stop at this frame (default: end of recording)")
+    out.add_argument('--every', type=int, default=1, help="render every n-th frame")
+    out.add_argument('--size', default='16x3', help="figure size in inches, WxH")
+    out.add_argument('--dpi', type=int, default=100)
+    out.add_argument('--render', choices=('atlas', 'axes'), default='atlas')
+    out.add_argument('--glyphs', choices=('pool', 'sprites', 'off'),
+                     help="default sprites (several times faster than pool), pool with --render axes")
+    out.add_argument('--symbols', type=int, default=12, help="max glyphs per layer")
+    args = parser.parse_args(argv)
+    if args.action == 'render' and args.render == 'axes' and args.glyphs == 'sprites':
+        out.error("--glyphs sprites needs --render atlas")
+
+    session = Session(args.session)
+    meta = session.meta
+    frames = session.end - session.start
+    if args.action == 'info':
+        print(f"{args.session}: recorded {meta['created']}, seed {meta['seed']}, "
+              f"{meta['layers']} layers x {meta['grid']} ({np.dtype(meta['dtype']).name}), "
+              f"{'lockstep' if meta['lockstep'] else 'free-running'}")
+        print(f"frames {session.start}-{session.end} ({frames / meta['fps']:.0f} s at {meta['fps']} fps), "
+              f"{session.command_count} commands on {sum(1 for c in session.ticks.values() if c)} frames")
+        return
+
+    width, height = (float(v) for v in args.size.lower().split('x'))
+    raw = None
+    if args.raw:
+        raw = sys.stdout.buffer if args.raw == '-' else open(args.raw, 'wb')
+    first, last = frame_range(session, args.first, args.last)
+    count = max(last - first + args.every - 1, 0) // args.every
+    print(f"Rendering {count} frames at {int(width * args.dpi)}x{int(height * args.dpi)} "
+          f"(ffmpeg: -f rawvideo -pix_fmt rgb24 -s {int(width * args.dpi)}x{int(height * args.dpi)} "
+          f"-r {meta['fps'] / args.every:g})", file=sys.stderr)
+    glyphs = args.glyphs or ('sprites' if args.render == 'atlas' else 'pool')
+    done, elapsed = render(session, args.out, raw, args.workers, args.first, args.last, args.every,
+                           (width, height), args.dpi, args.render, glyphs, args.symbols)
+    if raw is not None and raw is not sys.stdout.buffer:
+        raw.close()
+    print(f"{done} frames in {elapsed:.1f} s "
+          f"({done / max(elapsed, 1e-9) / meta['fps']:.1f}x real time)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
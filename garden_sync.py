@@ -0,0 +1,229 @@
+# ⋆⋆⋆ NEON GARDEN LOCKSTEP SYNC ⋆⋆⋆
+# Host and clients run the SAME seeded GardenEngine. The host stamps every
+# command with the frame it applies on and sends one TICK per frame; clients
+# only step a frame once they hold its tick, so every screen computes the
+# identical garden from commands alone.
+#
+# Keyframes: every SNAPSHOT_INTERVAL frames all nodes snap layers + ghosts
+# onto a uint8 grid. The host keeps that keyframe (delta-encoded + zlib) and
+# the ticks since, so a late joiner catches up from one transfer.
+
+import json
+import struct
+import threading
+import zlib
+
+import numpy as np
+
+from garden_commands import CommandPipeline
+from garden_engine import PARAMS
+from garden_protocol import (MSG_TICK, MSG_SNAPSHOT, MAX_BATCH, HEADER_SIZE, ProtocolError,
+                             frame, encode_tick, decode_tick)
+
+SNAPSHOT_INTERVAL = 64  # Frames between keyframes (~5 s at 80 ms)
+QUANT_SCALE = 120       # uint8 steps per unit: covers 0..2.125 (bloom overshoot)
+MAX_CATCHUP = 8         # Frames a client may simulate per display frame when behind
+
+_META_LEN = struct.Struct('!I')
+
+
+# ─── SNAPSHOTS ─────────────────────────
+def quantize_state(engine):
+    """Snap layers + ghosts onto the uint8 grid in place; returns the uint8 copies"""
+    quantized = []
+    for arr in (engine.layers, engine.memory_ghosts):
+        q = np.rint(np.clip(arr * QUANT_SCALE, 0, 255)).astype(np.uint8)
+        np.divide(q, QUANT_SCALE, out=arr)
+        quantized.append(q)
+    return quantized
+
+
+def encode_snapshot(engine, q_layers, q_ghosts):
+    """SNAPSHOT frame: u32 meta length | JSON meta | zlib(delta-encoded uint8 state)"""
+    meta = json.dumps({
+        'frame': engine.frame,
+        'layers': engine.num_layers,
+        'grid': engine.grid_size,
+        'rate': engine.rate,
+        'dtype': engine.dtype.name,
+        'params': {name: getattr(engine, name) for name in PARAMS},
+        'attention': engine.observer_attention.tolist(),
+        'strength': engine.bloom_strength.tolist(),
+        'triggers': engine.trigger_counts.tolist(),
+        'rng': engine.rng.bit_generator.state,
+    }).encode()
+    flat = np.concatenate((q_layers.ravel(), q_ghosts.ravel()))
+    delta = flat.copy()
+    delta[1:] -= flat[:-1]  # uint8 wraps, cumsum undoes it
+    return frame(MSG_SNAPSHOT, _META_LEN.pack(len(meta)) + meta + zlib.compress(delta.tobytes(), 6))
+
+
+def check_snapshot(engine, payload):
+    """(meta, raw state) of a SNAPSHOT payload; ProtocolError if it doesn't fit engine"""
+    try:
+        (meta_len,) = _META_LEN.unpack_from(payload)
+        meta = json.loads(payload[_META_LEN.size:_META_LEN.size + meta_len])
+        raw = zlib.decompress(payload[_META_LEN.size + meta_len:])
+    except (struct.error, ValueError, zlib.error) as e:
+        raise ProtocolError(f"malformed SNAPSHOT: {e}")
+    if (meta['layers'], meta['grid']) != (engine.num_layers, engine.grid_size):
+        raise ProtocolError(f"host garden is {meta['layers']} layers x {meta['grid']}, "
+                            f"ours is {engine.num_layers} x {engine.grid_size}")
+    if meta.get('rate', engine.rate) != engine.rate:
+        raise ProtocolError(f"host steps {meta['rate']} times a second, we step {engine.rate}")
+    if meta.get('dtype', engine.dtype.name) != engine.dtype.name:
+        raise ProtocolError(f"host simulates in {meta['dtype']}, we use {engine.dtype.name}")
+    return meta, raw
+
+
+def load_snapshot(engine, payload):
+    """Overwrite engine state from a SNAPSHOT payload"""
+    meta, raw = check_snapshot(engine, payload)
+    flat = np.cumsum(np.frombuffer(raw, dtype=np.uint8), dtype=np.uint8)
+    n = engine.layers.size
+    if flat.size != 2 * n:
+        raise ProtocolError("SNAPSHOT size mismatch")
+    np.divide(flat[:n].reshape(engine.layers.shape), QUANT_SCALE, out=engine.layers)
+    np.divide(flat[n:].reshape(engine.layers.shape), QUANT_SCALE, out=engine.memory_ghosts)
+    engine.observer_attention[:] = meta['attention']
+    engine.bloom_strength[:] = meta['strength']
+    engine.trigger_counts[:] = meta['triggers']
+    for name, value in meta['params'].items():
+        engine.set_param(name, value)
+    engine.rng.bit_generator.state = meta['rng']
+    engine.frame = meta['frame']
+    return meta['frame']
+
+
+def normalize_commands(engine, cmds):
+    """Bring layer numbers into range so every command survives the binary TICK"""
+    out = []
+    for cmd in cmds:
+        if cmd.get('type') in ('midi', 'collapse'):
+            cmd = dict(cmd, layer=cmd['layer'] % engine.num_layers)
+        out.append(cmd)
+    return out
+
+
+def step_frame(engine, cmds):
+    """The one lockstep frame transition, identical on every node"""
+    if engine.frame % SNAPSHOT_INTERVAL == 0:
+        quantize_state(engine)
+    for cmd in cmds:
+        engine.apply_command(cmd)
+    engine.evolve()
+
+
+# ─── HOST ──────────────────────────────
+class LockstepHost:
+    """Authoritative frame clock: stamps commands, publishes ticks and keyframes
+
+    publish(data) must send an encoded frame to every connected client.
+    """
+
+    def __init__(self, engine, publish=None):
+        self.engine = engine
+        self.publish = publish
+        self.pending = CommandPipeline(engine.num_layers)
+        self.lock = threading.Lock()
+        self.keyframe = None
+        self.history = []
+        self.ready = True
+
+    def submit(self, cmds):
+        """Thread-safe: queue local or client commands for the next tick"""
+        self.pending.extend(cmds)
+
+    def join_frames(self):
+        """What a late joiner needs: the last keyframe plus every tick since"""
+        with self.lock:
+            return [self.keyframe] + self.history if self.keyframe else []
+
+    def step(self):
+        engine = self.engine
+        cmds = self.pending.drain()[:MAX_BATCH]
+        data = encode_tick(engine.frame, normalize_commands(engine, cmds))
+
+        with self.lock:
+            if engine.frame % SNAPSHOT_INTERVAL == 0 or self.keyframe is None:
+                self.keyframe = encode_snapshot(engine, *quantize_state(engine))
+                self.history = []
+            self.history.append(data)
+        if self.publish:
+            self.publish(data)
+
+        # Apply exactly what went on the wire (float32 values, dropped extras)
+        _, canonical = decode_tick(data[HEADER_SIZE + 1:])
+        step_frame(engine, canonical)
+
+
+# ─── CLIENT ────────────────────────────
+class LockstepClient:
+    """Follows the host's ticks; sends local input to the host for stamping
+
+    send(cmds) must deliver commands to the host. A keyframe from the host
+    is only queued by the network thread; load_keyframe() applies it on
+    the simulation thread, between two steps, so it can't land mid-evolve.
+    """
+
+    def __init__(self, engine, send=None):
+        self.engine = engine
+        self.send = send
+        self.lock = threading.Lock()
+        self.ticks = {}
+        self.keyframe = None  # SNAPSHOT payload waiting for load_keyframe()
+        self.ready = False
+        self.refused = None   # Why the host's garden doesn't fit ours, once a keyframe said so
+
+    def submit(self, cmds):
+        if self.send:
+            self.send(cmds)
+
+    def on_frame(self, msg_type, payload):
+        """Network-thread hook for TICK / SNAPSHOT messages"""
+        if msg_type == MSG_SNAPSHOT:
+            try:
+                check_snapshot(self.engine, payload)
+            except ProtocolError as e:
+                self.refused = str(e)
+                raise  # A garden that can't fit drops the link here
+            with self.lock:
+                self.keyframe = payload
+        elif msg_type == MSG_TICK:
+            frame_no, cmds = decode_tick(payload)
+            with self.lock:
+                if not self.ready or frame_no >= self.engine.frame:
+                    self.ticks[frame_no] = cmds
+
+    def load_keyframe(self):
+        """Simulation thread: adopt a queued keyframe; True if one was loaded"""
+        with self.lock:
+            payload, self.keyframe = self.keyframe, None
+            if payload is None:
+                return False
+            start = load_snapshot(self.engine, payload)
+            self.ticks = {f: c for f, c in self.ticks.items() if f >= start}
+            self.ready = True
+            return True
+
+    def detach(self):
+        """Link to the host lost: free-run until a (re)joined host sends a keyframe"""
+        with self.lock:
+            self.ready = False
+            self.ticks = {}
+            self.keyframe = None
+
+    @property
+    def lag(self):
+        """Committed frames we have not simulated yet"""
+        with self.lock:
+            return len(self.ticks)
+
+    def step(self):
+        """Simulate every committed frame we hold, up to MAX_CATCHUP; returns frames run"""
+        steps = 0
+        with self.lock:
+            while self.ready and steps < MAX_CATCHUP and self.engine.frame in self.ticks:
+                step_frame(self.engine, self.ticks.pop(self.engine.frame))
+                steps += 1
+        return steps
@@ -0,0 +1,163 @@
+# ⋆⋆⋆ NEON GARDEN TILED ENGINE ⋆⋆⋆
+# GardenEngine whose evolve step is split into layer groups, one per worker
+# process, over arrays in shared memory. Nothing is pickled per frame: the
+# per-frame scalars (glitch speed, frame, RNG state) travel in a tiny shared
+# control block and the frame is paced by three barrier waits. Each group draws its own stretch of
+# the noise stream (PCG64.advance), so results match GardenEngine bit for bit.
+
+import atexit
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from garden_engine import GardenEngine, LAYERS, GRID_SIZE, SIM_RATE, layer_range
+
+SHARED = ('layers', 'memory_ghosts', 'noise', 'observer_attention')
+_STOP, _GLITCH, _SPLIT_RNG, _FRAME, _GHOST_INTERVAL = range(5)  # float64 control slots
+_CTRL_FLOATS = 5
+_MASK64 = (1 << 64) - 1
+WORKER_TIMEOUT = 30.0  # A frame barrier open this long means a worker died: raise, don't hang
+
+
+def _control_views(buf):
+    """(float64 flags, uint64 PCG64 state words) over the control block"""
+    flags = np.ndarray(_CTRL_FLOATS, np.float64, buffer=buf)
+    words = np.ndarray(4, np.uint64, buffer=buf, offset=_CTRL_FLOATS * 8)
+    return flags, words
+
+
+def _pcg_state(words):
+    return {'bit_generator': 'PCG64', 'has_uint32': 0, 'uinteger': 0,
+            'state': {'state': int(words[0]) << 64 | int(words[1]),
+                      'inc': int(words[2]) << 64 | int(words[3])}}
+
+
+def _worker(spec, ctrl_name, num_layers, grid_size, dtype, rate, start, stop, barrier):
+    """Worker process: evolve layers [start, stop) each time the barrier opens"""
+    blocks = [shared_memory.SharedMemory(name=name) for name, _, _ in spec.values()]
+    ctrl_block = shared_memory.SharedMemory(name=ctrl_name)
+    flags, words = _control_views(ctrl_block.buf)
+
+    shell = GardenEngine(1, grid_size, dtype, rate=rate)  # Cheap host object; only the shared arrays are used
+    for block, (name, (_, shape, arr_dtype)) in zip(blocks, spec.items()):
+        setattr(shell, name, np.ndarray(shape, arr_dtype, buffer=block.buf))
+    shell.num_layers = num_layers
+    part = shell.slice(start, stop)
+    part.rng = np.random.Generator(np.random.PCG64())
+    ghosts = shell.memory_ghosts
+    lower = ghosts[start - 1] if start > 0 else None
+    upper = ghosts[stop] if stop < num_layers else None
+    offset = start * grid_size * grid_size
+
+    while True:
+        barrier.wait()  # Frame starts
+        if flags[_STOP]:
+            break
+        part.glitch_speed = float(flags[_GLITCH])
+        part.frame = int(flags[_FRAME])
+        part.ghost_interval = int(flags[_GHOST_INTERVAL])
+        split = bool(flags[_SPLIT_RNG])
+        if split:
+            part.rng.bit_generator.state = _pcg_state(words)
+            part.rng.bit_generator.advance(offset)
+        part.evolve_local(noise_ready=not split)
+        barrier.wait()  # Every group's ghosts are current
+        part.bleed(lower, upper)
+        barrier.wait()  # Frame done
+
+    del flags, words, shell, part, ghosts, lower, upper
+    for block in blocks + [ctrl_block]:
+        block.close()
+
+
+class TiledEngine(GardenEngine):
+    """GardenEngine that evolves layer groups on worker processes (main runs group 0)
+
+    Same state, commands and results as GardenEngine; call close() when done
+    (also runs at exit).
+    """
+
+    def __init__(self, layers=LAYERS, grid_size=GRID_SIZE, dtype=np.float64, seed=None,
+                 workers=None, rate=SIM_RATE):
+        super().__init__(layers, grid_size, dtype, seed, rate=rate)
+        workers = max(1, min(workers or os.cpu_count() or 1, layers))
+        self.blocks = []
+        spec = {}
+        for name in SHARED:
+            arr = getattr(self, name)
+            block = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            shared = np.ndarray(arr.shape, arr.dtype, buffer=block.buf)
+            shared[...] = arr
+            setattr(self, name, shared)
+            self.blocks.append(block)
+            spec[name] = (block.name, arr.shape, arr.dtype.str)
+        self.ctrl_block = shared_memory.SharedMemory(create=True, size=(_CTRL_FLOATS + 4) * 8)
+        self.flags, self.words = _control_views(self.ctrl_block.buf)
+        self.flags[:] = 0
+
+        self.groups = [layer_range(layers, workers, k) for k in range(workers)]
+        ctx = mp.get_context('spawn')  # No fork of a process that already runs Tk / asyncio threads
+        self.barrier = ctx.Barrier(workers, timeout=WORKER_TIMEOUT)
+        self.workers = [ctx.Process(target=_worker, daemon=True, name=f"garden-tile-{k}",
+                                    args=(spec, self.ctrl_block.name, layers, grid_size,
+                                          self.dtype.str, rate, start, stop, self.barrier))
+                        for k, (start, stop) in enumerate(self.groups) if k]
+        for proc in self.workers:
+            proc.start()
+        self.part = self.slice(*self.groups[0])
+        atexit.register(self.close)
+
+    def _can_split_rng(self):
+        """Noise can be drawn per group when one double = one PCG64 step (no buffered uint32)"""
+        bit_gen = self.rng.bit_generator
+        return (self.dtype == np.float64 and isinstance(bit_gen, np.random.PCG64)
+                and not bit_gen.state['has_uint32'])
+
+    def evolve(self):
+        if self.part is None:
+            return super().evolve()
+        split = self._can_split_rng()
+        self.flags[_GLITCH] = self.glitch_speed
+        self.flags[_FRAME] = self.frame
+        self.flags[_GHOST_INTERVAL] = self.ghost_interval
+        self.flags[_SPLIT_RNG] = split
+        if split:
+            state = self.rng.bit_generator.state['state']
+            self.words[:] = (state['state'] >> 64, state['state'] & _MASK64,
+                             state['inc'] >> 64, state['inc'] & _MASK64)
+        else:
+            self.rng.random(out=self.noise, dtype=self.dtype)
+
+        start, stop = self.groups[0]
+        self.barrier.wait()
+        self.part.glitch_speed = self.glitch_speed
+        self.part.frame = self.frame
+        self.part.ghost_interval = self.ghost_interval
+        self.part.evolve_local(noise_ready=not split)  # Group 0 draws from self.rng directly
+        if split:
+            self.rng.bit_generator.advance(self.noise.size - self.part.noise.size)
+        self.barrier.wait()
+        self.part.bleed(None, self.memory_ghosts[stop] if stop < self.num_layers else None)
+        self.barrier.wait()
+
+        self.bloom()
+        self.frame += 1
+
+    def close(self):
+        """Stop the workers and move the arrays back to private memory"""
+        if self.part is None:
+            return
+        self.flags[_STOP] = 1
+        self.barrier.wait()
+        for proc in self.workers:
+            proc.join()
+        self.part = None
+        for name in SHARED:
+            setattr(self, name, np.array(getattr(self, name)))
+        del self.flags, self.words
+        for block in self.blocks + [self.ctrl_block]:
+            block.close()
+            block.unlink()
+        self.blocks = []
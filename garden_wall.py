@@ -0,0 +1,248 @@
+# ⋆⋆⋆ NEON GARDEN WALL (DISTRIBUTED LAYERS) ⋆⋆⋆
+# Splits one tall layer stack across machines: node k owns a contiguous
+# range of layers and renders only that slice. The only coupling between
+# layers is the ±1 ghost bleed, so each frame a node sends its first and
+# last ghost layer to the nodes below / above and waits for theirs.
+#
+# Node k listens on base_port + k for node k+1 and connects to node k-1.
+#
+#   python garden_wall.py --nodes 3 --spawn --layers 48 --frames 500 --headless   # loopback test
+#   python garden_wall.py --nodes 4 --index 2 --layers 64 --grid 120 --lower-ip 10.0.0.11 \
+#                         --host-ip 10.0.0.2    # commands from a relay or lockstep host
+#
+# A lockstep host sends performer input only inside its TICKs; the wall
+# takes their commands as they come and ignores the host's frame numbers
+# and keyframes, since the wall's stack is its own.
+
+import argparse
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from garden_engine import GardenEngine, layer_range
+from garden_net import EventLoopThread, GardenServer, GardenClient, PORT
+from garden_protocol import MSG_HALO, MSG_TICK, MAX_FRAME, ProtocolError, decode_tick, frame
+
+BASE_PORT = 5200
+CONNECT_TIMEOUT = 60.0  # Seconds to wait for the neighbours at startup
+HALO_TIMEOUT = 5.0      # A neighbour silent this long is dropped; its edge runs open
+
+_FRAME_NO = struct.Struct('!I')
+
+
+# ─── HALO MESSAGES ─────────────────────
+def encode_halo(frame_no, ghost):
+    """HALO frame: u32 frame | one ghost layer, raw little-endian"""
+    raw = ghost.astype(ghost.dtype.newbyteorder('<'), copy=False).tobytes()
+    return frame(MSG_HALO, _FRAME_NO.pack(frame_no) + raw)
+
+
+def decode_halo(payload, dtype, grid_size):
+    (frame_no,) = _FRAME_NO.unpack_from(payload)
+    raw = payload[_FRAME_NO.size:]
+    dtype = np.dtype(dtype).newbyteorder('<')
+    if len(raw) != grid_size * grid_size * dtype.itemsize:
+        raise ProtocolError("HALO size mismatch")
+    return frame_no, np.frombuffer(raw, dtype=dtype).reshape(grid_size, grid_size)
+
+
+class HaloInbox:
+    """Ghost layers from one neighbour, keyed by frame (never more than ~2 held)"""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.frames = {}
+
+    def put(self, frame_no, ghost):
+        with self.cond:
+            self.frames[frame_no] = ghost
+            self.cond.notify_all()
+
+    def take(self, frame_no, timeout=HALO_TIMEOUT):
+        """This frame's ghost layer, or None if it didn't arrive in time"""
+        with self.cond:
+            self.cond.wait_for(lambda: frame_no in self.frames, timeout)
+            for f in [f for f in self.frames if f < frame_no]:
+                del self.frames[f]
+            return self.frames.pop(frame_no, None)
+
+
+# ─── NODE ──────────────────────────────
+class WallNode:
+    """One slice of the wall: a GardenEngine for layers [start, stop) plus its two links"""
+
+    def __init__(self, total_layers, nodes, index, grid_size=20, dtype=np.float64, seed=None,
+                 lower_ip='127.0.0.1', base_port=BASE_PORT):
+        if not 0 <= index < nodes <= total_layers:
+            raise ValueError(f"need 0 <= index < nodes <= layers, got {index}/{nodes}/{total_layers}")
+        self.total_layers = total_layers
+        self.nodes = nodes
+        self.index = index
+        self.start, self.stop = layer_range(total_layers, nodes, index)
+        self.engine = GardenEngine(self.stop - self.start, grid_size, dtype=dtype,
+                                   seed=None if seed is None else [seed, index],
+                                   first_layer=self.start, total_layers=total_layers)
+        if grid_size * grid_size * self.engine.dtype.itemsize + 16 > MAX_FRAME:
+            raise ValueError(f"grid {grid_size} is too large for one HALO frame")
+        self.lower_ip = lower_ip
+        self.base_port = base_port
+        self.has_lower = index > 0
+        self.has_upper = index < nodes - 1
+        self.from_lower = HaloInbox()
+        self.from_upper = HaloInbox()
+        self.net = None
+        self.server = None
+        self.client = None
+
+    # ─── LINKS ─────────────────────────
+    def connect(self, timeout=CONNECT_TIMEOUT):
+        """Open both neighbour links; returns once the wall around us is up"""
+        self.net = EventLoopThread(name=f"garden-wall-{self.index}")
+        deadline = time.monotonic() + timeout
+        if self.has_upper:
+            self.server = GardenServer('0.0.0.0', self.base_port + self.index,
+                                       on_commands=lambda cmds, peer: None,
+                                       on_frame=self._on_upper_frame).start(self.net)
+        if self.has_lower:
+            while True:
+                try:
+                    self.client = GardenClient(self.lower_ip, self.base_port + self.index - 1,
+                                               on_commands=lambda cmds: None,
+                                               on_frame=self._on_lower_frame).connect(net=self.net)
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise
+                    time.sleep(0.2)
+        while self.has_upper and not self.server.client_count:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"node {self.index + 1} never connected")
+            time.sleep(0.05)
+        print(f"Wall node {self.index}: layers {self.start}-{self.stop - 1} of {self.total_layers}")
+        return self
+
+    def close(self):
+        """Deliver the last HALOs, then close both links, so neighbours finish their frame too"""
+        if self.server:
+            self.server.stop(flush=True)
+        if self.client:
+            self.client.close(flush=True)
+        if self.net:
+            self.net.stop()
+
+    def _on_lower_frame(self, msg_type, payload):
+        if msg_type == MSG_HALO:
+            self.from_lower.put(*decode_halo(payload, self.engine.dtype, self.engine.grid_size))
+
+    def _on_upper_frame(self, msg_type, payload, peer):
+        if msg_type == MSG_HALO:
+            self.from_upper.put(*decode_halo(payload, self.engine.dtype, self.engine.grid_size))
+
+    # ─── COMMANDS ──────────────────────
+    def submit(self, cmds):
+        """Thread-safe: queue wall-wide commands; layer commands for other nodes are skipped"""
+        for cmd in cmds:
+            if cmd.get('type') in ('midi', 'collapse'):
+                layer = cmd['layer'] % self.total_layers
+                if not self.start <= layer < self.stop:
+                    continue
+                cmd = dict(cmd, layer=layer - self.start)
+            self.engine.commands.push(cmd)
+
+    def on_host_frame(self, msg_type, payload):
+        """Network thread: a lockstep host's TICKs carry its performers' commands"""
+        if msg_type == MSG_TICK:
+            self.submit(decode_tick(payload)[1])
+
+    # ─── FRAME ─────────────────────────
+    def step(self):
+        """Commands, local half of evolve, ghost exchange, coupled half"""
+        engine = self.engine
+        engine.process_commands()
+        engine.evolve_local()
+        frame_no = engine.frame
+        if self.has_lower:
+            self.client.send_frame(encode_halo(frame_no, engine.memory_ghosts[0]))
+        if self.has_upper:
+            self.server.broadcast_frame(encode_halo(frame_no, engine.memory_ghosts[-1]))
+        lower = self.from_lower.take(frame_no) if self.has_lower else None
+        upper = self.from_upper.take(frame_no) if self.has_upper else None
+        if self.has_lower and lower is None:
+            print(f"Wall node {self.index}: lost node {self.index - 1}, running its edge open")
+            self.has_lower = False
+        if self.has_upper and upper is None:
+            print(f"Wall node {self.index}: lost node {self.index + 1}, running its edge open")
+            self.has_upper = False
+        engine.evolve_coupled(lower, upper)
+
+
+# ─── LAUNCH ────────────────────────────
+def spawn_all(argv, nodes):
+    """Loopback test: run every node as its own process and wait for them"""
+    procs = [subprocess.Popen([sys.executable, __file__, *argv, '--index', str(i)])
+             for i in range(nodes)]
+    sys.exit(max(p.wait() for p in procs))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(description="One node of a multi-machine neon garden wall")
+    parser.add_argument('--nodes', type=int, required=True)
+    parser.add_argument('--index', type=int, help="this node's position, 0 = first layers")
+    parser.add_argument('--spawn', action='store_true', help="start every node on this machine")
+    parser.add_argument('--layers', type=int, default=48, help="layers across the whole wall")
+    parser.add_argument('--grid', type=int, default=20)
+    parser.add_argument('--float32', action='store_true')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--lower-ip', default='127.0.0.1', help="address of node index-1")
+    parser.add_argument('--base-port', type=int, default=BASE_PORT)
+    parser.add_argument('--host-ip', help="take performer commands from this garden host")
+    parser.add_argument('--host-port', type=int, default=PORT)
+    parser.add_argument('--headless', action='store_true', help="simulate only, no window")
+    parser.add_argument('--frames', type=int, default=0, help="stop after this many frames")
+    args = parser.parse_args(argv)
+
+    if args.spawn:
+        spawn_all([a for a in argv if a != '--spawn'], args.nodes)
+    if args.index is None:
+        parser.error("--index is required unless --spawn is given")
+
+    node = WallNode(args.layers, args.nodes, args.index, args.grid,
+                    np.float32 if args.float32 else np.float64, args.seed,
+                    args.lower_ip, args.base_port).connect()
+    if args.host_ip:
+        GardenClient(args.host_ip, args.host_port, on_commands=node.submit,
+                     on_frame=node.on_host_frame).connect()
+
+    if args.headless:
+        start = time.perf_counter()
+        while not args.frames or node.engine.frame < args.frames:
+            node.step()
+        elapsed = time.perf_counter() - start
+        node.close()
+        print(f"Wall node {args.index}: {node.engine.frame} frames, "
+              f"{node.engine.frame / elapsed:.1f} fps, checksum {node.engine.layers.sum():.6f}")
+        return
+
+    import matplotlib.pyplot as plt
+    import matplotlib.animation as animation
+    from garden_render import make_renderer
+    renderer = make_renderer('atlas', node.engine, figsize=(16, 3))
+
+    def update(frame):
+        node.step()
+        if args.frames and node.engine.frame >= args.frames:
+            plt.close(renderer.fig)
+        return renderer.draw(frame)
+
+    ani = animation.FuncAnimation(renderer.fig, update, interval=80, blit=True,
+                                  cache_frame_data=False)
+    plt.show()
+
+
+if __name__ == '__main__':
+    main()
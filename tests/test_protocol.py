@@ -0,0 +1,41 @@
+# Run from the repository root: python -m pytest tests
+
+import json
+import struct
+
+import pytest
+
+from garden_protocol import (CMD_ADJUST, CMD_MIDI, MSG_COMMANDS, MSG_JSON, PARAM_IDS, ProtocolError,
+                             decode_commands)
+
+
+def json_frame(cmd):
+    return decode_commands(MSG_JSON, json.dumps(cmd).encode())
+
+
+def record_frame(kind, ident, value):
+    return decode_commands(MSG_COMMANDS, struct.pack('!H', 1) + struct.pack('!BHf', kind, ident, value))
+
+
+@pytest.mark.parametrize('cmd', [
+    {'type': 'adjust', 'param': 'glitch_speed', 'value': float('nan')},
+    {'type': 'adjust', 'param': 'glitch_speed', 'value': float('inf')},
+    {'type': 'adjust', 'param': 'glitch_speed', 'value': True},
+    {'type': 'midi', 'layer': 3, 'strength': float('nan')},
+    {'type': 'midi', 'layer': 3, 'strength': float('-inf')},
+])
+def test_json_rejects_non_finite_and_bool_values(cmd):
+    with pytest.raises(ProtocolError):
+        json_frame(cmd)
+
+
+@pytest.mark.parametrize('kind, ident', [(CMD_MIDI, 3), (CMD_ADJUST, PARAM_IDS['glitch'])])
+@pytest.mark.parametrize('value', [float('nan'), float('inf'), float('-inf')])
+def test_records_reject_non_finite_values(kind, ident, value):
+    with pytest.raises(ProtocolError):
+        record_frame(kind, ident, value)
+
+
+def test_finite_commands_still_decode():
+    assert json_frame({'type': 'adjust', 'param': 'glitch_speed', 'value': 0.5})[0]['value'] == 0.5
+    assert record_frame(CMD_MIDI, 3, 0.5) == [{'type': 'midi', 'layer': 3, 'strength': 0.5}]